@@ -0,0 +1,170 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+
+class Segment:
+
+    def __init__(self, path, day):
+        self.path = path
+        self.day = day
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+        self.file = gzip.open(path, 'ab')
+
+
+class AuditLog:
+    """
+    Bitácora de payloads recibidos. write() solo encola el registro; un hilo
+    en segundo plano (uno por proceso) lo serializa y escribe por lotes en un
+    segmento gzip por tenant y por proceso, que rota al cambiar el día o al
+    superar max_bytes, así los workers de gunicorn no mezclan sus escrituras.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, batch_size=500, flush_interval=1.0, queue_size=10000):
+        self.directory = directory or getattr(settings, 'FACIAL_AUDIT_LOG_DIR', os.path.join('logs', 'facial_recognition'))
+        self.max_bytes = max_bytes or getattr(settings, 'FACIAL_AUDIT_LOG_MAX_BYTES', 64 * 1024 * 1024)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue = None
+        self._segments = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def write(self, schema_name, record):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((schema_name or 'public', record))
+        except queue.Full:
+            # Nunca se bloquea la petición por la bitácora
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        # Como en el registro de tenants: el hilo y la cola se crean por PID
+        # para sobrevivir al fork de los workers
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._segments = {}
+            self._pid = pid
+        threading.Thread(target=self._run, name='facial-audit-log', daemon=True).start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.warning("No se pudo escribir la bitácora de reconocimiento facial: %s", e)
+
+    def _write_batch(self, batch):
+        lines = {}
+        for schema_name, record in batch:
+            lines.setdefault(schema_name, []).append(
+                json.dumps(self.serialize(record), cls=DjangoJSONEncoder).encode('utf-8') + b'\n'
+            )
+        with self._lock:
+            for schema_name, schema_lines in lines.items():
+                data = b''.join(schema_lines)
+                segment = self._segment(schema_name)
+                segment.file.write(data)
+                segment.file.flush()
+                segment.size += len(data)
+
+    @staticmethod
+    def serialize(record):
+        data = record.get('request_data')
+        if isinstance(data, (bytes, bytearray)):
+            record = dict(record, request_data=bytes(data).decode('utf-8', errors='replace'))
+        return record
+
+    def _segment(self, schema_name):
+        today = date.today()
+        segment = self._segments.get(schema_name)
+        if segment is not None and (segment.day != today or segment.size >= self.max_bytes):
+            segment.file.close()
+            segment = None
+        if segment is None:
+            directory = os.path.join(self.directory, schema_name)
+            os.makedirs(directory, exist_ok=True)
+            index = 0
+            while True:
+                path = os.path.join(directory, '{0}-{1}-{2}{3}'.format(
+                    today.isoformat(), os.getpid(), index, SEGMENT_SUFFIX))
+                if not os.path.exists(path) or os.path.getsize(path) < self.max_bytes:
+                    break
+                index += 1
+            segment = self._segments[schema_name] = Segment(path, today)
+        return segment
+
+    def close(self):
+        """ Escribe lo pendiente en la cola y cierra los segmentos (al terminar el proceso) """
+        pending = []
+        while self._queue is not None:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            self._write_batch(pending)
+        with self._lock:
+            for segment in self._segments.values():
+                segment.file.close()
+            self._segments = {}
+
+
+def read_segment(path):
+    """
+    Registros de un segmento; tolera el final truncado de un proceso que
+    terminó sin cerrar el archivo. Acepta también el antiguo
+    facial_recognition_logs.json sin comprimir.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        except EOFError:
+            logger.warning("Segmento %s truncado, se leyó hasta el último registro completo", path)
+
+
+audit_log = AuditLog()
+
+
+def build_record(request_data, schema_name=None, location=None, movement_type=None):
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'schema_name': schema_name,
+        'location': location,
+        'movement_type': movement_type,
+        'request_data': request_data,
+    }
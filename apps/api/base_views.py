@@ -9,8 +9,11 @@ class SecureAPIView(APIView):
             return JsonResponse({'error': 'Tenant not specified'}, status=400)
 
         if hasattr(request, 'tenant'):
+            # Los permisos compilados del consumidor ya se cargaron en APIAuthMiddleware
             if not request.api_consumer.can_access_tenant(request.tenant):
                 return JsonResponse({'error': 'Access denied for this tenant'}, status=403)
+            if not request.api_consumer.can_access_path(request.tenant, request.path):
+                return JsonResponse({'error': 'Access denied for this path'}, status=403)
 
         with tenant_context(request.tenant if hasattr(request, 'tenant') else None):
             return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
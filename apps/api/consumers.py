@@ -0,0 +1,157 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, When, F, Value, DateTimeField, PositiveIntegerField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from apps.api.models import APIConsumer, APIConsumerTenant
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_CACHE_TIMEOUT = getattr(settings, 'API_CONSUMER_CACHE_TIMEOUT', 60)
+
+PERMISSIONS_CACHE_TIMEOUT = getattr(settings, 'API_CONSUMER_PERMISSIONS_CACHE_TIMEOUT', 60 * 60)
+
+USAGE_DIRTY_KEY = 'api:usage:dirty'
+USAGE_COUNT_KEY = 'api:usage:count:{0}'
+USAGE_LAST_KEY = 'api:usage:last:{0}'
+
+# Marca para tokens inexistentes, evita consultar la base de datos en cada intento
+INVALID_TOKEN = 'invalid'
+
+
+def token_cache_key(token):
+    return 'api:consumer:' + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def get_consumer(token):
+    """Obtiene el consumidor activo del token desde la cache, o None si no existe"""
+    key = token_cache_key(token)
+    consumer = cache.get(key)
+    if consumer is None:
+        try:
+            consumer = APIConsumer.objects.get(token=token, is_active=True)
+        except APIConsumer.DoesNotExist:
+            consumer = INVALID_TOKEN
+        cache.set(key, consumer, timeout=CONSUMER_CACHE_TIMEOUT)
+    return None if consumer == INVALID_TOKEN else consumer
+
+
+def invalidate_consumer(consumer):
+    cache.delete(token_cache_key(consumer.token))
+
+
+class ConsumerPermissions:
+    """
+    Mapa compilado de permisos de un consumidor: tenants habilitados y, por
+    cada uno, los prefijos de rutas permitidos (sin rutas = todas las rutas).
+    """
+
+    def __init__(self, has_full_access, tenants):
+        self.has_full_access = has_full_access
+        self.tenants = tenants
+
+    def can_access_tenant(self, tenant):
+        return self.has_full_access or tenant.pk in self.tenants
+
+    def can_access_path(self, tenant, path):
+        if self.has_full_access:
+            return True
+        allowed_paths = self.tenants.get(tenant.pk)
+        if allowed_paths is None:
+            return False
+        # Se compara por segmentos: /api/novelties no habilita /api/novelties-admin/
+        return not allowed_paths or any(
+            path == allowed or path.startswith(allowed.rstrip('/') + '/') for allowed in allowed_paths
+        )
+
+
+def permissions_cache_key(consumer_id):
+    return 'api:consumer-permissions:{0}'.format(consumer_id)
+
+
+def get_permissions(consumer):
+    key = permissions_cache_key(consumer.pk)
+    permissions = cache.get(key)
+    if permissions is None:
+        tenants = {
+            tenant_id: tuple(allowed_paths or ())
+            for tenant_id, allowed_paths in APIConsumerTenant.objects.filter(
+                consumer_id=consumer.pk
+            ).values_list('tenant_id', 'allowed_paths')
+        }
+        permissions = ConsumerPermissions(consumer.has_full_access, tenants)
+        cache.set(key, permissions, timeout=PERMISSIONS_CACHE_TIMEOUT)
+    return permissions
+
+
+def invalidate_permissions(consumer_id):
+    cache.delete(permissions_cache_key(consumer_id))
+
+
+def record_usage(consumer):
+    """Acumula el uso del consumidor en Redis, sin escribir en la base de datos"""
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.incr(USAGE_COUNT_KEY.format(consumer.pk))
+        pipe.set(USAGE_LAST_KEY.format(consumer.pk), timezone.now().isoformat())
+        pipe.sadd(USAGE_DIRTY_KEY, consumer.pk)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("No se pudo registrar el uso del consumidor %s: %s", consumer.pk, e)
+
+
+def flush_usage(batch_size=500):
+    """
+    Vuelca los contadores de uso acumulados en Redis a APIConsumer con un único
+    UPDATE por lote. Retorna la cantidad de consumidores actualizados.
+    """
+    redis = get_redis_connection('default')
+    updated = 0
+    while True:
+        ids = redis.spop(USAGE_DIRTY_KEY, batch_size)
+        if not ids:
+            return updated
+
+        pipe = redis.pipeline(transaction=False)
+        for _id in ids:
+            pipe.getset(USAGE_COUNT_KEY.format(int(_id)), 0)
+            pipe.get(USAGE_LAST_KEY.format(int(_id)))
+        values = pipe.execute()
+
+        usage = {}
+        for index, _id in enumerate(ids):
+            count = int(values[index * 2] or 0)
+            last_used_at = values[index * 2 + 1]
+            if count:
+                usage[int(_id)] = (count, parse_datetime(last_used_at.decode()) if last_used_at else timezone.now())
+
+        if not usage:
+            continue
+
+        try:
+            APIConsumer.objects.filter(pk__in=usage.keys()).update(
+                usage_count=F('usage_count') + Case(
+                    *[When(pk=pk, then=Value(count)) for pk, (count, _) in usage.items()],
+                    default=Value(0),
+                    output_field=PositiveIntegerField()
+                ),
+                last_used_at=Case(
+                    *[When(pk=pk, then=Value(last)) for pk, (_, last) in usage.items()],
+                    default=F('last_used_at'),
+                    output_field=DateTimeField()
+                ),
+            )
+        except Exception:
+            # Se devuelven los contadores para no perder el uso en el siguiente volcado
+            pipe = redis.pipeline(transaction=False)
+            for pk, (count, _) in usage.items():
+                pipe.incrby(USAGE_COUNT_KEY.format(pk), count)
+                pipe.sadd(USAGE_DIRTY_KEY, pk)
+            pipe.execute()
+            raise
+        updated += len(usage)
@@ -0,0 +1,537 @@
+import json
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import TextField, Value
+from django.db.models.functions import MD5, Cast
+from django.utils.functional import cached_property
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.main.catalogs import PERSON_TYPES, get_person_types_map
+from apps.main.models import News
+
+FORMAT_CHUNK_SIZE = 2000
+FORMAT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Plantillas compiladas por (código, digest de la plantilla); se vacía al llegar al límite
+COMPILED_CACHE_SIZE = 512
+
+HEALTH_CONDITIONS = {
+    'good': 'Buena',
+    'average': 'Regular',
+    'bad': 'Mala',
+    'not_in_service': 'No se encuentra en el servicio'
+}
+
+FORMATTERS = {}
+_compiled = {}
+
+
+def register(cls):
+    """ Registra el formateador bajo el TypeNews.code que atiende """
+    FORMATTERS[cls.code] = cls()
+    return cls
+
+
+def get_formatter(type_code):
+    return FORMATTERS.get(type_code, DEFAULT_FORMATTER)
+
+
+class FormatContext:
+    """ Datos compartidos por todas las filas de una respuesta """
+
+    def __init__(self, person_types=None):
+        if person_types is not None:
+            self.person_types = person_types
+
+    @cached_property
+    def person_types(self):
+        return get_person_types_map()
+
+
+class NoveltyFormatter:
+    """
+    Formato de las novedades de un tipo. compile() recibe la plantilla de la
+    novedad y se ejecuta una vez por versión de plantilla; format() recibe el
+    info de cada fila y devuelve los campos que se agregan a los datos base.
+    Al cambiar la salida de format() se incrementa version para descartar la
+    cache de novedades ya formateadas.
+    """
+    code = None
+    version = 1
+    uses_template = False
+
+    def cache_version(self, context):
+        return str(self.version)
+
+    def compile(self, template):
+        return None
+
+    def format(self, info, compiled, context):
+        return {}
+
+
+DEFAULT_FORMATTER = NoveltyFormatter()
+
+
+def first_key(info, prefix):
+    return next((key for key in info if key.startswith(prefix)), None)
+
+
+def field_label(field):
+    return (field.get('label') or '').lower().replace(' ', '_')
+
+
+def format_errata(errata):
+    return {
+        'editado': errata.get('edited', False),
+        'observacion': errata.get('observation_errata', '')
+    }
+
+
+def format_material(material):
+    return {
+        'codigo': material.get('code'),
+        'item': material.get('item'),
+        'nombre': material.get('name'),
+        'cantidad': material.get('amount', 0),
+        'observacion': material.get('observation', ''),
+        'condicion': {
+            'codigo': material.get('health_condition'),
+            'descripcion': HEALTH_CONDITIONS.get(material.get('health_condition'), 'Desconocida')
+        }
+    }
+
+
+def drop_empty(data, *keys):
+    for key in keys:
+        if not data[key]:
+            del data[key]
+
+
+def drop_empty_errata(data):
+    if not data.get('erratas', {}).get('observacion'):
+        data.pop('erratas', None)
+
+
+@register
+class GuardChangeFormatter(NoveltyFormatter):
+    """ Cambio de guardia """
+    code = '001'
+    uses_template = True
+    MAPPED_CODES = ('SELECTION', 'FREE_TEXT')
+
+    def compile(self, template):
+        # Todas las claves SELECTION_/FREE_TEXT_ toman la etiqueta del último campo de su código
+        labels = {}
+        for field in template:
+            code = field.get('code')
+            if code in self.MAPPED_CODES:
+                labels[code + '_'] = field_label(field) or code.lower()
+        return tuple(labels.items())
+
+    def format(self, info, compiled, context):
+        data = {}
+        for key, value in info.items():
+            label = next((label for prefix, label in compiled if key.startswith(prefix)), None)
+            if label is not None:
+                data[label] = value
+            elif key.startswith('PLANNED_STAFF_'):
+                if 'personal_recibe' not in data:
+                    data['personal_recibe'] = value
+                elif 'personal_disponible_dia_libre' not in data:
+                    data['personal_disponible_dia_libre'] = value
+                elif 'personal_faltante' not in data:
+                    data['personal_faltante'] = value
+            elif key.startswith('OESVICA_STAFF_'):
+                data['personal_no_planificado'] = value
+            elif key.startswith('FORMER_GUARD_'):
+                data['personal_entrega'] = value
+            elif key.startswith('ATTACHED_FILE_'):
+                attached_files = info[first_key(info, 'ATTACHED_FILE_')].get('attachedFiles')
+                if attached_files:
+                    data['archivos_adjuntos'] = attached_files
+            elif key.startswith('ERRATA_'):
+                data['erratas'] = value
+        return data
+
+
+@register
+class WorkMaterialsFormatter(NoveltyFormatter):
+    """ Materiales de trabajo """
+    code = '002'
+
+    def format(self, info, compiled, context):
+        data = {
+            'materiales_oesvica': [format_material(material) for material in info.get('SUB_LINE_1', ())],
+            'materiales_cliente': [format_material(material) for material in info.get('SUB_LINE_3', ())],
+        }
+        if 'ERRATA_5' in info:
+            data['erratas'] = format_errata(info['ERRATA_5'])
+        drop_empty(data, 'materiales_oesvica', 'materiales_cliente')
+        drop_empty_errata(data)
+        return data
+
+
+@register
+class RoundFormatter(NoveltyFormatter):
+    """ Rondas perimetrales """
+    code = '003'
+
+    def format(self, info, compiled, context):
+        data = {'ronda': {}, 'personal': []}
+        for key, value in info.items():
+            if key.startswith('ROUND_'):
+                data['ronda'] = {
+                    'numero': value.get('number'),
+                    'hora_inicio': value.get('hour_start'),
+                    'hora_fin': value.get('hour_end'),
+                    'observaciones': value.get('observation')
+                }
+            elif key.startswith('PLANNED_STAFF_'):
+                data['personal'].extend({
+                    'nombre': member.get('name_and_surname'),
+                    'codigo_ficha': member.get('cod_ficha'),
+                    'telefono': member.get('telefono'),
+                } for member in value)
+        errata_key = first_key(info, 'ERRATA_')
+        if errata_key:
+            data['erratas'] = format_errata(info[errata_key])
+        drop_empty(data, 'personal')
+        drop_empty_errata(data)
+        return data
+
+
+@register
+class VehicleFormatter(NoveltyFormatter):
+    """ Control de vehículos """
+    code = '004'
+
+    def format(self, info, compiled, context):
+        data = {}
+        vehicle_key = first_key(info, 'VEHICLE_')
+        if vehicle_key:
+            vehicle = info[vehicle_key]
+            data.update({
+                'hora': vehicle.get('hour'),
+                'tipo_movimiento': 'ENTRADA' if vehicle.get('movement_type') == 'employee' else 'SALIDA',
+                'placa': vehicle.get('license_plate'),
+                'modelo': vehicle.get('model'),
+                'propietario': vehicle.get('owner_full_name'),
+                'tipo_propietario': vehicle.get('owner_type', '').upper(),
+            })
+        free_text_key = first_key(info, 'FREE_TEXT_')
+        if free_text_key:
+            data['observaciones'] = info[free_text_key]
+        return data
+
+
+@register
+class EmployeeAccessFormatter(NoveltyFormatter):
+    """ Registro de entrada/salida de empleados: la última persona es el autorizador """
+    code = '005'
+
+    def format(self, info, compiled, context):
+        data = {'empleados': [], 'autorizador': None}
+        person_keys = [key for key in info if key.startswith('PERSON')]
+        for key in person_keys[:-1]:
+            person = info[key]
+            data['empleados'].append({
+                'nombre_completo': person.get('full_name', '').strip(),
+                'identificacion': person.get('identification_number'),
+                'hora': person.get('hour'),
+                'tipo_movimiento': 'ENTRADA' if person.get('entry') else 'SALIDA',
+                'razon_visita': person.get('reason_visit'),
+                'numero_tarjeta': person.get('assigned_card_number'),
+                'observaciones': person.get('observacion', '')
+            })
+        if person_keys:
+            person = info[person_keys[-1]]
+            data['autorizador'] = {
+                'nombre': person.get('full_name', '').strip(),
+                'identificacion': person.get('identification_number')
+            }
+        if 'ERRATA_5' in info:
+            data['erratas'] = format_errata(info['ERRATA_5'])
+        drop_empty(data, 'empleados')
+        if data.get('autorizador') and not data['autorizador'].get('nombre'):
+            del data['autorizador']
+        drop_empty_errata(data)
+        return data
+
+
+@register
+class VisitorFormatter(NoveltyFormatter):
+    """ Control de visitantes """
+    code = '006'
+    uses_template = True
+
+    def cache_version(self, context):
+        # La descripción del tipo de persona forma parte de la salida
+        return '{0}.{1}'.format(self.version, PERSON_TYPES.version())
+
+    def compile(self, template):
+        # Acciones de los campos adicionales en el orden de la plantilla
+        actions = []
+        for field in template:
+            code = field.get('code')
+            if code == 'SELECTION':
+                actions.append((code, field_label(field)))
+            elif code in ('PERSONS', 'ERRATA'):
+                actions.append((code, None))
+        return tuple(actions)
+
+    def format(self, info, compiled, context):
+        data = {'personas': [], 'personas_adicionales': [], 'autorizador': None}
+        tipo_descripcion, tipo_movimiento, razon_visita = 'N/A', '', ''
+
+        for key, person in info.items():
+            if not key.startswith('PERSON_'):
+                continue
+            type_person_id = person.get('type_person')
+            if not type_person_id:
+                # El autorizador no tiene tipo de persona
+                data['autorizador'] = {
+                    'nombre': person.get('full_name'),
+                    'identificacion': person.get('identification_number')
+                }
+                continue
+            tipo_descripcion = context.person_types.get(type_person_id, {}).get('descripcion', 'Desconocido')
+            tipo_movimiento = 'ENTRADA' if person.get('movement_type') == 'employee' else 'SALIDA'
+            razon_visita = person.get('reason_visit')
+            data['personas'].append({
+                'tipo_id': type_person_id,
+                'tipo_descripcion': tipo_descripcion,
+                'nombre_completo': person.get('full_name'),
+                'identificacion': person.get('identification_number'),
+                'hora': person.get('hour'),
+                'tipo_movimiento': tipo_movimiento,
+                'razon_visita': razon_visita,
+                'lugar_recepcion': person.get('place_of_reception'),
+                'numero_tarjeta': person.get('assigned_card_number'),
+                'fue_acompanado_por_oficial': person.get('accompany_visitor', 0),
+                'empresa': person.get('company_name', ''),
+                'rif': person.get('rif', '')
+            })
+
+        for code, label in compiled:
+            if code == 'SELECTION':
+                key = first_key(info, 'SELECTION_')
+                if key and label:
+                    data[label] = info[key]
+            elif code == 'PERSONS':
+                for key, persons in info.items():
+                    if key.startswith('PERSONS_'):
+                        data['personas_adicionales'].extend({
+                            'identificacion': person.get('identification_number'),
+                            'nombre': person.get('full_name'),
+                            'numero_tarjeta': person.get('assigned_card_number'),
+                            'tipo_descripcion': tipo_descripcion,
+                            'tipo_movimiento': tipo_movimiento,
+                            'razon_visita': razon_visita,
+                        } for person in persons)
+            else:
+                key = first_key(info, 'ERRATA_')
+                if key:
+                    data['erratas'] = format_errata(info[key])
+
+        drop_empty(data, 'personas', 'personas_adicionales')
+        if data['autorizador'] is None:
+            del data['autorizador']
+        return data
+
+
+@register
+class AssetFormatter(NoveltyFormatter):
+    """ Reporte de entrada y salida de activos """
+    code = '007'
+    # Unidad de empaque -> cantidad
+    PACKING_UNITS = (('SELECTION_5', 'AMOUNT_8'), ('SELECTION_7', 'AMOUNT_10'), ('SELECTION_9', 'AMOUNT_13'))
+
+    def format(self, info, compiled, context):
+        data = {
+            'tipo_activo': info.get('SELECTION_2'),
+            'descripcion_activo': info.get('FREE_TEXT_3'),
+            'unidades_empaque': [
+                {'tipo': info[unit_key], 'cantidad': info[amount_key]}
+                for unit_key, amount_key in self.PACKING_UNITS
+                if info.get(unit_key) and info.get(amount_key)
+            ],
+            'motivo': info.get('FREE_TEXT_11'),
+            'condicion_activo': info.get('SELECTION_12'),
+            'cantidad_total': info.get('AMOUNT_13'),
+            'persona': None,
+            'autorizador': None,
+        }
+        # La primera persona es el transportista/empleado y la segunda el autorizador
+        person_keys = [key for key in info if key.startswith('PERSON_')][:2]
+        if person_keys:
+            person = info[person_keys[0]]
+            data['persona'] = {
+                'nombre_completo': person.get('full_name', '').strip(),
+                'identificacion': person.get('identification_number'),
+                'empresa': person.get('company_name', ''),
+                'rif': person.get('rif', ''),
+                'hora': person.get('hour', ''),
+                'numero_guia': person.get('guide_number', ''),
+                'tipo_movimiento': 'ENTRADA' if person.get('entry', False) else 'SALIDA'
+            }
+        if len(person_keys) > 1:
+            person = info[person_keys[1]]
+            data['autorizador'] = {
+                'nombre_completo': person.get('full_name', '').strip(),
+                'identificacion': person.get('identification_number', '')
+            }
+        if 'ERRATA_17' in info:
+            data['erratas'] = format_errata(info['ERRATA_17'])
+        drop_empty(data, 'unidades_empaque')
+        drop_empty_errata(data)
+        return data
+
+
+@register
+class ImportantNoveltyFormatter(NoveltyFormatter):
+    """ Novedad importante """
+    code = '0010'
+
+    def format(self, info, compiled, context):
+        data = {
+            'descripcion': info.get('FREE_TEXT_1'),
+            'fecha': None,
+            'hora': info.get('HOUR_3'),
+            'personal_involucrado': [],
+        }
+        if info.get('DATE_2'):
+            try:
+                data['fecha'] = datetime.strptime(info['DATE_2'], '%Y-%m-%d').strftime('%Y-%m-%d')
+            except (ValueError, TypeError):
+                # Se conserva el valor original si no se puede interpretar
+                data['fecha'] = info['DATE_2']
+        staff = info.get('OESVICA_STAFF_4')
+        if isinstance(staff, list):
+            data['personal_involucrado'] = [{
+                'nombre': member.get('name_and_surname', '').strip(),
+                'codigo_ficha': member.get('cod_ficha', ''),
+                'telefono': member.get('telefono', '')
+            } for member in staff if isinstance(member, dict)]
+        if 'ERRATA_6' in info:
+            data['erratas'] = format_errata(info['ERRATA_6'])
+        drop_empty(data, 'personal_involucrado', 'fecha')
+        drop_empty_errata(data)
+        return data
+
+
+def get_compiled(formatter, digest, load_template):
+    """ Plantilla compilada por el formateador; load_template solo se llama la primera vez que aparece """
+    key = (formatter.code, digest)
+    if key not in _compiled:
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.clear()
+        template = load_template() if digest else None
+        if isinstance(template, str):
+            template = json.loads(template)
+        _compiled[key] = formatter.compile(template or [])
+    return _compiled[key]
+
+
+def format_rows(rows, type_code, load_template, context=None):
+    """
+    Formatea filas (id, number, created, employee, info, digest de la plantilla)
+    de forma incremental y devuelve pares (id, datos). load_template(id)
+    devuelve la plantilla de esa novedad.
+    """
+    formatter = get_formatter(type_code)
+    context = context or FormatContext()
+    time_zone = pytz.timezone(settings.TIME_ZONE)
+    for news_id, number, created, employee, info, digest in rows:
+        compiled = None
+        if formatter.uses_template:
+            compiled = get_compiled(formatter, digest, lambda: load_template(news_id))
+        if isinstance(info, str):
+            info = json.loads(info)
+        data = {
+            'number': number,
+            'fecha': created.astimezone(time_zone).strftime('%Y-%m-%d %H:%M'),
+            'empleado': employee
+        }
+        data.update(formatter.format(info or {}, compiled, context))
+        yield news_id, data
+
+
+def news_rows(queryset, type_code):
+    digest = Value(None, output_field=TextField())
+    if get_formatter(type_code).uses_template:
+        digest = MD5(Cast('template', TextField()))
+    return queryset.annotate(template_digest=digest).values_list(
+        'id', 'number', 'created', 'employee', 'info', 'template_digest'
+    )
+
+
+def load_template(news_id):
+    return News.objects.filter(id=news_id).values_list('template', flat=True).first()
+
+
+def format_cache_key(type_code, version, news_id, updated):
+    return 'novelty-format:{0}:{1}:{2}:{3}:{4}'.format(
+        connection.schema_name, type_code, version, news_id, updated.timestamp())
+
+
+def encode(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+def iter_chunks(rows, size):
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+def cache_formatted(type_code, keys, context):
+    """ Formatea las novedades de keys ({id: clave}) y las guarda en cache; devuelve {id: json} """
+    rows = news_rows(News.objects.filter(id__in=list(keys)), type_code)
+    blobs = {news_id: encode(data) for news_id, data in format_rows(rows, type_code, load_template, context)}
+    cache.set_many({keys[news_id]: blob for news_id, blob in blobs.items()}, timeout=FORMAT_CACHE_TIMEOUT)
+    return blobs
+
+
+def formatted_novelties(queryset, type_code, context=None):
+    """
+    JSON de cada novedad del queryset con el formato de su tipo, de la más
+    reciente a la más antigua. Cada novedad se guarda en cache por tenant, id,
+    versión del formateador y updated: las consultas repetidas solo leen ids
+    y updated, y formatean únicamente lo que cambió.
+    """
+    context = context or FormatContext()
+    version = get_formatter(type_code).cache_version(context)
+    rows = queryset.order_by('-created', '-id').values_list('id', 'updated').iterator(chunk_size=FORMAT_CHUNK_SIZE)
+    for chunk in iter_chunks(rows, FORMAT_CHUNK_SIZE):
+        keys = {news_id: format_cache_key(type_code, version, news_id, updated) for news_id, updated in chunk}
+        cached = cache.get_many(keys.values())
+        blobs = {news_id: cached[key] for news_id, key in keys.items() if key in cached}
+        missing = {news_id: key for news_id, key in keys.items() if news_id not in blobs}
+        if missing:
+            blobs.update(cache_formatted(type_code, missing, context))
+        for news_id, _ in chunk:
+            if news_id in blobs:
+                yield blobs[news_id]
+
+
+def warm_formatted_novelties(news_ids):
+    """ Llena la cache de formato de las novedades recién guardadas """
+    by_type = defaultdict(dict)
+    for news_id, updated, type_code in News.objects.filter(id__in=news_ids).values_list(
+            'id', 'updated', 'type_news__code'):
+        by_type[type_code][news_id] = updated
+    context = FormatContext()
+    for type_code, rows in by_type.items():
+        version = get_formatter(type_code).cache_version(context)
+        cache_formatted(type_code, {
+            news_id: format_cache_key(type_code, version, news_id, updated) for news_id, updated in rows.items()
+        }, context)
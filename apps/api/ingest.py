@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import socket
+from collections import defaultdict
+from datetime import datetime
+
+import pytz
+from django.db import transaction
+from django_redis import get_redis_connection
+from django_tenants.utils import get_tenant_model, tenant_context
+from redis.exceptions import ResponseError
+
+from apps.setting.models import FacialRecognitionEvent
+from apps.setting.occupancy import update_occupancy
+from newsbookbackend.tenant_registry import registry
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = 'facial-events'
+STREAM_GROUP = 'facial-ingest'
+STREAM_MAXLEN = 1000000
+
+DEFAULT_BOUNDARY = b'myboundary'
+READ_CHUNK_SIZE = 16 * 1024
+DRAIN_COUNT = 1000
+ENQUEUE_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 1000
+
+# Mensajes entregados y sin confirmar por más de este tiempo se reasignan a otro consumidor
+STALE_IDLE_MS = 60 * 1000
+MAX_DELIVERIES = 5
+
+
+def load_tenant(schema_name):
+    return get_tenant_model().objects.get(schema_name=schema_name)
+
+
+def boundary_from_content_type(content_type):
+    """ Boundary del header Content-Type (ej: multipart/x-mixed-replace; boundary=myboundary) """
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'boundary' and value:
+            return value.strip('"').encode('latin-1')
+    return DEFAULT_BOUNDARY
+
+
+def part_body(part):
+    """ Cuerpo JSON de una parte: descarta headers y las partes que no son texto (ej: image/jpeg) """
+    part = part.strip()
+    if part.startswith(b'--'):
+        part = part[2:].lstrip()
+    if not part or part.startswith(b'{'):
+        return bytes(part)
+    headers, separator, body = part.partition(b'\r\n\r\n')
+    if not separator:
+        headers, separator, body = part.partition(b'\n\n')
+    if not separator:
+        return None
+    content_type = b''
+    for line in headers.splitlines():
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-type':
+            content_type = value.strip().lower()
+    if content_type and not content_type.startswith((b'text/', b'application/json')):
+        return None
+    body = body.strip()
+    return bytes(body) if body.startswith(b'{') else None
+
+
+def iter_parts(stream, boundary, chunk_size=READ_CHUNK_SIZE):
+    """
+    Lee el cuerpo multipart/x-mixed-replace por bloques y devuelve el JSON de
+    cada parte a medida que se completa, sin cargar ni decodificar todo el cuerpo.
+    """
+    delimiter = b'--' + boundary
+    buffer = bytearray()
+    search_from = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        while True:
+            index = buffer.find(delimiter, search_from)
+            if index == -1:
+                # El delimitador pudo quedar cortado entre dos bloques
+                search_from = max(0, len(buffer) - len(delimiter) + 1)
+                break
+            body = part_body(buffer[:index])
+            if body:
+                yield body
+            del buffer[:index + len(delimiter)]
+            search_from = 0
+        if not chunk:
+            break
+    body = part_body(buffer)
+    if body:
+        yield body
+
+
+def enqueue_payloads(schema_name, location, movement_type, payloads):
+    """
+    Agrega cada payload al stream de Redis con un pipeline que se envía cada
+    ENQUEUE_BATCH_SIZE partes, así un cuerpo grande no se acumula en memoria.
+    Devuelve cuántos se encolaron.
+    """
+    pipeline = get_redis_connection('default').pipeline(transaction=False)
+    queued = 0
+    for payload in payloads:
+        pipeline.xadd(STREAM_KEY, {
+            's': schema_name, 'l': location or '', 'm': movement_type, 'p': payload
+        }, maxlen=STREAM_MAXLEN, approximate=True)
+        queued += 1
+        if not queued % ENQUEUE_BATCH_SIZE:
+            pipeline.execute()
+    if queued % ENQUEUE_BATCH_SIZE:
+        pipeline.execute()
+    return queued
+
+
+def parse_events(payload):
+    """ Datos de todos los eventos del payload: {"Events": [{"Data": {...}}, ...]} o un evento suelto """
+    data = json.loads(payload) if isinstance(payload, (bytes, bytearray, str)) else payload
+    if isinstance(data, dict) and isinstance(data.get('Events'), list):
+        return [event.get('Data', {}) for event in data['Events'] if isinstance(event, dict)]
+    return [data] if isinstance(data, dict) else []
+
+
+def build_event(data, location, movement_type):
+    user_id = data.get('UserID')
+    create_time = data.get('CreateTime')
+    if not user_id or not create_time:
+        raise ValueError("Faltan 'UserID' o 'CreateTime' en los datos")
+    user_id = str(user_id)[:100]
+    user_name = data.get('CardName')
+    event_time = datetime.utcfromtimestamp(int(create_time)).replace(tzinfo=pytz.UTC)
+    return FacialRecognitionEvent(
+        user_id=user_id,
+        user_name=str(user_name)[:255] if user_name else None,
+        event_time=event_time,
+        raw_data=data,
+        location=location or None,
+        movement_type=movement_type,
+        event_key=FacialRecognitionEvent.build_event_key(location, user_id, event_time, movement_type),
+    )
+
+
+def insert_events(tenant, events):
+    """ Inserta los eventos del tenant y actualiza la ocupación en una sola transacción """
+    with tenant_context(tenant), transaction.atomic():
+        # Los reenvíos de los dispositivos chocan con event_key y se descartan (ON CONFLICT DO NOTHING)
+        FacialRecognitionEvent.objects.bulk_create(events, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True)
+        update_occupancy(events)
+
+
+def insert_one_by_one(tenant, tenant_messages):
+    """
+    Inserta los mensajes del tenant por separado para que una fila inválida no
+    arrastre a las demás. Devuelve los ids insertados; los que fallan quedan
+    pendientes y se descartan al superar MAX_DELIVERIES.
+    """
+    inserted = []
+    for message_id, events in tenant_messages:
+        try:
+            insert_events(tenant, events)
+        except Exception as e:
+            logger.warning("Evento facial %s no insertado: %s", message_id, e)
+            continue
+        inserted.append(message_id)
+    return inserted
+
+
+def ensure_group(conn):
+    try:
+        conn.xgroup_create(STREAM_KEY, STREAM_GROUP, id='0', mkstream=True)
+    except ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def consumer_name():
+    return '{0}:{1}'.format(socket.gethostname(), os.getpid())
+
+
+def claim_stale(conn, consumer, count):
+    """ Reasigna mensajes de consumidores caídos; descarta los que fallan repetidamente """
+    stale, poison = [], []
+    for pending in conn.xpending_range(STREAM_KEY, STREAM_GROUP, '-', '+', count):
+        if pending['time_since_delivered'] < STALE_IDLE_MS:
+            continue
+        if pending['times_delivered'] >= MAX_DELIVERIES:
+            poison.append(pending['message_id'])
+        else:
+            stale.append(pending['message_id'])
+    if poison:
+        logger.error("Se descartan %s eventos faciales tras %s intentos", len(poison), MAX_DELIVERIES)
+        conn.xack(STREAM_KEY, STREAM_GROUP, *poison)
+        conn.xdel(STREAM_KEY, *poison)
+    if not stale:
+        return []
+    return conn.xclaim(STREAM_KEY, STREAM_GROUP, consumer, STALE_IDLE_MS, stale)
+
+
+def drain_events(consumer=None, count=DRAIN_COUNT, block=None):
+    """
+    Lee un lote del stream con el grupo de consumidores, agrupa los eventos por
+    tenant y los inserta con bulk_create. Los mensajes se confirman después de
+    insertar, así un fallo los deja pendientes para reintentarlos.
+    Devuelve la cantidad de mensajes leídos.
+    """
+    conn = get_redis_connection('default')
+    consumer = consumer or consumer_name()
+    ensure_group(conn)
+
+    messages = claim_stale(conn, consumer, count)
+    response = conn.xreadgroup(STREAM_GROUP, consumer, {STREAM_KEY: '>'}, count=count, block=block)
+    for _, stream_messages in response or ():
+        messages.extend(stream_messages)
+    if not messages:
+        return 0
+
+    batches = defaultdict(list)
+    discarded = []
+    for message_id, fields in messages:
+        if not fields:
+            # Eliminado del stream mientras estaba pendiente
+            discarded.append(message_id)
+            continue
+        try:
+            location = fields[b'l'].decode('utf-8')
+            movement_type = fields[b'm'].decode('utf-8')
+            events = [build_event(data, location, movement_type) for data in parse_events(fields[b'p'])]
+        except Exception as e:
+            # Solo se descarta este mensaje; el resto del lote sigue
+            logger.warning("Evento facial descartado (%s): %s", message_id, e)
+            discarded.append(message_id)
+            continue
+        batches[fields[b's'].decode('utf-8')].append((message_id, events))
+
+    for schema_name, tenant_messages in batches.items():
+        ids = [message_id for message_id, _ in tenant_messages]
+        try:
+            tenant = registry.get_by_schema(schema_name, load_tenant)
+        except get_tenant_model().DoesNotExist:
+            logger.warning("Eventos faciales descartados: no existe el tenant %s", schema_name)
+            discarded.extend(ids)
+            continue
+        try:
+            insert_events(tenant, [event for _, events in tenant_messages for event in events])
+        except Exception as e:
+            logger.exception("Error insertando eventos faciales de %s, se reintenta por mensaje: %s", schema_name, e)
+            ids = insert_one_by_one(tenant, tenant_messages)
+        if ids:
+            conn.xack(STREAM_KEY, STREAM_GROUP, *ids)
+            conn.xdel(STREAM_KEY, *ids)
+
+    if discarded:
+        conn.xack(STREAM_KEY, STREAM_GROUP, *discarded)
+        conn.xdel(STREAM_KEY, *discarded)
+    return len(messages)
@@ -0,0 +1,107 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.api.formatters import FORMATTERS, FormatContext, format_rows
+
+TYPE_PERSON_ID = str(uuid.uuid4())
+
+TEMPLATES = {
+    '001': [
+        {'code': 'SELECTION', 'label': 'Estado del puesto'},
+        {'code': 'FREE_TEXT', 'label': 'Observaciones'},
+        {'code': 'PLANNED_STAFF', 'label': 'Personal planificado'},
+        {'code': 'ERRATA', 'label': 'Errata'},
+    ],
+    '006': [
+        {'code': 'PERSON', 'label': 'Visitante'},
+        {'code': 'SELECTION', 'label': 'Area visitada'},
+        {'code': 'PERSONS', 'label': 'Acompañantes'},
+        {'code': 'ERRATA', 'label': 'Errata'},
+    ],
+}
+
+
+def person(index, type_person=TYPE_PERSON_ID):
+    return {
+        'type_person': type_person,
+        'full_name': ' Persona %s ' % index,
+        'identification_number': 'V%08d' % index,
+        'hour': '08:30',
+        'movement_type': 'employee',
+        'entry': bool(index % 2),
+        'reason_visit': 'Reunión',
+        'assigned_card_number': str(index % 100),
+        'company_name': 'Empresa',
+        'rif': 'J-000000000',
+    }
+
+
+def staff(index):
+    return [{'name_and_surname': ' Guardia %s ' % i, 'cod_ficha': str(i), 'telefono': '0414000000'}
+            for i in range(index % 4 + 1)]
+
+
+def errata(index):
+    return {'edited': True, 'observation_errata': 'Corrección' if index % 3 == 0 else ''}
+
+
+def synthetic_info(code, index):
+    """ info con la forma que guarda la app para cada tipo de novedad """
+    if code == '001':
+        return {'SELECTION_1': 'Operativo', 'FREE_TEXT_2': 'Sin novedad', 'PLANNED_STAFF_3': staff(index),
+                'PLANNED_STAFF_4': staff(index + 1), 'OESVICA_STAFF_5': staff(index),
+                'FORMER_GUARD_6': staff(index), 'ATTACHED_FILE_7': {'attachedFiles': []}, 'ERRATA_8': errata(index)}
+    if code == '002':
+        materials = [{'code': str(i), 'item': i, 'name': 'Material %s' % i, 'amount': i,
+                      'health_condition': random.choice(('good', 'average', 'bad', 'other'))} for i in range(5)]
+        return {'SUB_LINE_1': materials, 'SUB_LINE_3': materials[:2], 'ERRATA_5': errata(index)}
+    if code == '003':
+        return {'ROUND_1': {'number': index, 'hour_start': '08:00', 'hour_end': '09:00', 'observation': ''},
+                'PLANNED_STAFF_2': staff(index), 'ERRATA_3': errata(index)}
+    if code == '004':
+        return {'VEHICLE_1': {'hour': '08:00', 'movement_type': 'employee', 'license_plate': 'AB%05d' % index,
+                              'model': 'Modelo', 'owner_full_name': 'Dueño', 'owner_type': 'employee'},
+                'FREE_TEXT_2': 'Sin novedad'}
+    if code == '005':
+        return {'PERSON_1': person(index), 'PERSON_2': person(index + 1), 'PERSON_3': person(index + 2, None),
+                'ERRATA_5': errata(index)}
+    if code == '006':
+        return {'PERSON_1': person(index), 'PERSON_2': person(index + 1, None), 'SELECTION_3': 'Oficinas',
+                'PERSONS_4': [person(index + i) for i in range(3)], 'ERRATA_5': errata(index)}
+    if code == '007':
+        return {'SELECTION_2': 'Equipo', 'FREE_TEXT_3': 'Laptop', 'SELECTION_5': 'Cajas', 'AMOUNT_8': 2,
+                'FREE_TEXT_11': 'Reparación', 'SELECTION_12': 'Buena', 'AMOUNT_13': 2,
+                'PERSON_14': person(index), 'PERSON_15': person(index + 1, None), 'ERRATA_17': errata(index)}
+    return {'FREE_TEXT_1': 'Incidente', 'DATE_2': '2024-01-%02d' % (index % 28 + 1), 'HOUR_3': '10:00',
+            'OESVICA_STAFF_4': staff(index), 'ERRATA_6': errata(index)}
+
+
+class Command(BaseCommand):
+    help = ("Mide filas por segundo de los formateadores de NoveltyByTypeAPI sobre datos sintéticos "
+            "en memoria, sin base de datos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Filas por tipo de novedad")
+        parser.add_argument('--repeat', type=int, default=3, help="Repeticiones; se reporta la mejor")
+        parser.add_argument('--code', action='append', help="Tipos a medir (por defecto todos los registrados)")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        context = FormatContext(person_types={TYPE_PERSON_ID: {'descripcion': 'Visitante'}})
+        for code in options['code'] or sorted(FORMATTERS):
+            template = TEMPLATES.get(code, [])
+            rows = [(uuid.uuid4(), index, now, 'benchmark', synthetic_info(code, index), 'v1')
+                    for index in range(options['rows'])]
+            best = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                for _ in format_rows(iter(rows), code, lambda news_id: template, context):
+                    pass
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write("%s: %s filas en %.3fs (%.0f filas/s)" % (
+                code, len(rows), best, len(rows) / best if best else 0))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.api.ingest import DRAIN_COUNT, consumer_name, drain_events
+
+
+class Command(BaseCommand):
+    help = ("Consume de forma continua el stream de eventos de reconocimiento facial y los inserta por tenant. "
+            "Alternativa a la tarea periódica drain_facial_events para cargas altas.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=DRAIN_COUNT, help="Mensajes por lote")
+        parser.add_argument('--block', type=int, default=5000, help="Milisegundos de espera por mensajes nuevos")
+
+    def handle(self, *args, **options):
+        consumer = consumer_name()
+        self.stdout.write("Consumidor %s esperando eventos..." % consumer)
+        while True:
+            drain_events(consumer, count=options['count'], block=options['block'])
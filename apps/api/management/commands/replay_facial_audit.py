@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_tenant_model
+
+from apps.api.audit import read_segment
+from apps.api.ingest import INSERT_BATCH_SIZE, build_event, insert_events, load_tenant, parse_events
+from apps.setting.models import FacialRecognitionEvent
+
+
+class Command(BaseCommand):
+    help = ("Reprocesa segmentos de la bitácora de reconocimiento facial e inserta los eventos en "
+            "FacialRecognitionEvent. Los eventos ya registrados se descartan por event_key.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Segmentos .jsonl.gz (o el antiguo facial_recognition_logs.json)")
+        parser.add_argument('--schema', help="Insertar en este schema en lugar del indicado en cada registro")
+        parser.add_argument('--dry-run', action='store_true', help="Solo contar los eventos, sin insertarlos")
+
+    def handle(self, *args, **options):
+        tenants = {}
+        pending = defaultdict(list)
+        totals = defaultdict(int)
+        skipped = 0
+
+        for path in options['paths']:
+            for record in read_segment(path):
+                # Los registros antiguos guardaban el schema en url_params.cliente
+                schema_name = options['schema'] or record.get('schema_name') or \
+                    record.get('url_params', {}).get('cliente')
+                try:
+                    events = [
+                        build_event(data, record.get('location'), record.get('movement_type') or FacialRecognitionEvent.IN)
+                        for data in parse_events(record.get('request_data'))
+                    ]
+                except (TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if not schema_name or not events:
+                    skipped += 1
+                    continue
+                pending[schema_name].extend(events)
+                totals[schema_name] += len(events)
+                if len(pending[schema_name]) >= INSERT_BATCH_SIZE:
+                    self.flush(tenants, schema_name, pending, options['dry_run'])
+
+        for schema_name in list(pending):
+            self.flush(tenants, schema_name, pending, options['dry_run'])
+        for schema_name, total in sorted(totals.items()):
+            self.stdout.write(self.style.SUCCESS("%s: %s eventos reprocesados" % (schema_name, total)))
+        if skipped:
+            self.stdout.write(self.style.WARNING("%s registros sin eventos válidos" % skipped))
+
+    @staticmethod
+    def flush(tenants, schema_name, pending, dry_run):
+        events = pending.pop(schema_name, [])
+        if dry_run or not events:
+            return
+        if schema_name not in tenants:
+            try:
+                tenants[schema_name] = load_tenant(schema_name)
+            except get_tenant_model().DoesNotExist:
+                raise CommandError("No existe el tenant %s" % schema_name)
+        insert_events(tenants[schema_name], events)
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.functional import cached_property
 from django_tenants.models import TenantMixin
 import secrets
 from django.contrib.postgres.fields import ArrayField
@@ -22,11 +25,17 @@ class APIConsumer(models.Model):
             self.token = secrets.token_urlsafe(48)
         super().save(*args, **kwargs)
 
+    @cached_property
+    def permissions(self):
+        from apps.api.consumers import get_permissions
+
+        return get_permissions(self)
+
     def can_access_tenant(self, tenant):
-        return self.has_full_access or APIConsumerTenant.objects.filter(
-            consumer=self,
-            tenant=tenant
-        ).exists()
+        return self.permissions.can_access_tenant(tenant)
+
+    def can_access_path(self, tenant, path):
+        return self.permissions.can_access_path(tenant, path)
 
 
 class APIConsumerTenant(models.Model):
@@ -41,4 +50,21 @@ class APIConsumerTenant(models.Model):
 
     class Meta:
         app_label = 'api'
-        unique_together = ('consumer', 'tenant')
\ No newline at end of file
+        unique_together = ('consumer', 'tenant')
+
+
+@receiver(post_save, sender=APIConsumer)
+@receiver(post_delete, sender=APIConsumer)
+def invalidate_api_consumer(sender, instance, **kwargs):
+    from apps.api.consumers import invalidate_consumer, invalidate_permissions
+
+    invalidate_consumer(instance)
+    invalidate_permissions(instance.pk)
+
+
+@receiver(post_save, sender=APIConsumerTenant)
+@receiver(post_delete, sender=APIConsumerTenant)
+def invalidate_api_consumer_tenant(sender, instance, **kwargs):
+    from apps.api.consumers import invalidate_permissions
+
+    invalidate_permissions(instance.consumer_id)
@@ -0,0 +1,30 @@
+from newsbookbackend.celery import app
+
+
+@app.task
+def flush_api_usage():
+    from apps.api.consumers import flush_usage
+
+    return flush_usage()
+
+
+@app.task(ignore_result=True)
+def drain_facial_events(max_batches=50):
+    from apps.api.ingest import drain_events
+
+    total = 0
+    for _ in range(max_batches):
+        read = drain_events()
+        total += read
+        if not read:
+            break
+    return total
+
+
+@app.task(ignore_result=True)
+def warm_novelty_formats(schema_name, news_ids):
+    from apps.api.formatters import warm_formatted_novelties
+    from apps.customers.utils import iter_tenants
+
+    for _ in iter_tenants(schema_name):
+        warm_formatted_novelties(news_ids)
@@ -0,0 +1,203 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from apps.api.formatters import FormatContext, format_rows
+
+VISITOR = '7f1c6a52-0d0e-4c1b-9a57-3c1d2f0e8b11'
+UNKNOWN = '00000000-0000-0000-0000-000000000000'
+PERSON_TYPES = {VISITOR: {'descripcion': 'Visitante', 'prioridad': '1', 'es_institucion': False,
+                          'requiere_datos_empresa': False}}
+
+LUIS = {'name_and_surname': ' Luis Gómez ', 'cod_ficha': '101', 'telefono': '04140000001'}
+MARIA = {'name_and_surname': 'María Rojas', 'cod_ficha': '102', 'telefono': '04140000002'}
+
+# 03:30 UTC es el 31/01 a las 23:30 en America/Caracas
+CREATED = datetime(2024, 2, 1, 3, 30, tzinfo=timezone.utc)
+
+# Por tipo: (info, template, campos que agrega el formato). Las salidas se
+# obtuvieron de NoveltyByTypeAPI._format_by_type antes de pasar a los
+# formateadores de apps.api.formatters, incluido el orden de las claves.
+GOLDEN = {
+    '001': (
+        {'SELECTION_1': 'Operativo', 'FREE_TEXT_2': 'Sin novedad', 'PLANNED_STAFF_3': [LUIS],
+         'PLANNED_STAFF_4': [MARIA], 'PLANNED_STAFF_5': [], 'OESVICA_STAFF_6': [LUIS, MARIA],
+         'FORMER_GUARD_7': [LUIS], 'ATTACHED_FILE_8': {'attachedFiles': ['acta.pdf']},
+         'ERRATA_9': {'edited': True, 'observation_errata': 'Hora corregida'}},
+        [{'code': 'SELECTION', 'label': 'Estado del puesto'}, {'code': 'FREE_TEXT', 'label': ''},
+         {'code': 'PLANNED_STAFF', 'label': 'Personal'}, {'code': 'ERRATA', 'label': 'Errata'}],
+        {
+            'estado_del_puesto': 'Operativo',
+            'free_text': 'Sin novedad',
+            'personal_recibe': [LUIS],
+            'personal_disponible_dia_libre': [MARIA],
+            'personal_faltante': [],
+            'personal_no_planificado': [LUIS, MARIA],
+            'personal_entrega': [LUIS],
+            'archivos_adjuntos': ['acta.pdf'],
+            'erratas': {'edited': True, 'observation_errata': 'Hora corregida'},
+        },
+    ),
+    '002': (
+        {'SUB_LINE_1': [{'code': 'M1', 'item': 1, 'name': 'Linterna', 'amount': 2, 'health_condition': 'good'},
+                        {'code': 'M2', 'item': 2, 'name': 'Radio', 'health_condition': 'broken',
+                         'observation': 'Sin batería'}],
+         'SUB_LINE_3': [{'code': 'C1', 'item': 1, 'name': 'Llaves', 'amount': 5, 'health_condition': 'average'}],
+         'ATTACHED_FILE_4': {'attachedFiles': ['foto.jpg']},
+         'ERRATA_5': {'edited': True, 'observation_errata': 'Faltaba un radio'}},
+        [],
+        {
+            'materiales_oesvica': [
+                {'codigo': 'M1', 'item': 1, 'nombre': 'Linterna', 'cantidad': 2, 'observacion': '',
+                 'condicion': {'codigo': 'good', 'descripcion': 'Buena'}},
+                {'codigo': 'M2', 'item': 2, 'nombre': 'Radio', 'cantidad': 0, 'observacion': 'Sin batería',
+                 'condicion': {'codigo': 'broken', 'descripcion': 'Desconocida'}},
+            ],
+            'materiales_cliente': [
+                {'codigo': 'C1', 'item': 1, 'nombre': 'Llaves', 'cantidad': 5, 'observacion': '',
+                 'condicion': {'codigo': 'average', 'descripcion': 'Regular'}},
+            ],
+            'erratas': {'editado': True, 'observacion': 'Faltaba un radio'},
+        },
+    ),
+    '003': (
+        {'ROUND_1': {'number': 3, 'hour_start': '08:00', 'hour_end': '09:15', 'observation': 'Cerca dañada'},
+         'PLANNED_STAFF_2': [LUIS, MARIA], 'ERRATA_3': {'edited': False, 'observation_errata': ''}},
+        [],
+        {
+            'ronda': {'numero': 3, 'hora_inicio': '08:00', 'hora_fin': '09:15', 'observaciones': 'Cerca dañada'},
+            'personal': [{'nombre': ' Luis Gómez ', 'codigo_ficha': '101', 'telefono': '04140000001'},
+                         {'nombre': 'María Rojas', 'codigo_ficha': '102', 'telefono': '04140000002'}],
+        },
+    ),
+    '004': (
+        {'VEHICLE_1': {'hour': '07:45', 'movement_type': 'employee', 'license_plate': 'AB123CD',
+                       'model': 'Hilux', 'owner_full_name': 'Pedro Díaz', 'owner_type': 'employee'},
+         'FREE_TEXT_2': 'Ingresa con herramientas'},
+        [],
+        {
+            'hora': '07:45',
+            'tipo_movimiento': 'ENTRADA',
+            'placa': 'AB123CD',
+            'modelo': 'Hilux',
+            'propietario': 'Pedro Díaz',
+            'tipo_propietario': 'EMPLOYEE',
+            'observaciones': 'Ingresa con herramientas',
+        },
+    ),
+    '005': (
+        {'PERSON_1': {'full_name': ' Ana Pérez ', 'identification_number': 'V1', 'hour': '06:00', 'entry': True,
+                      'reason_visit': 'Turno', 'assigned_card_number': '12'},
+         'PERSON_2': {'full_name': 'José Mora', 'identification_number': 'V2', 'hour': '06:05', 'entry': False,
+                      'observacion': 'Sale temprano'},
+         'PERSON_3': {'full_name': ' Supervisor ', 'identification_number': 'V3'},
+         'ERRATA_5': {'edited': True, 'observation_errata': 'Cédula corregida'}},
+        [],
+        {
+            'empleados': [
+                {'nombre_completo': 'Ana Pérez', 'identificacion': 'V1', 'hora': '06:00', 'tipo_movimiento': 'ENTRADA',
+                 'razon_visita': 'Turno', 'numero_tarjeta': '12', 'observaciones': ''},
+                {'nombre_completo': 'José Mora', 'identificacion': 'V2', 'hora': '06:05', 'tipo_movimiento': 'SALIDA',
+                 'razon_visita': None, 'numero_tarjeta': None, 'observaciones': 'Sale temprano'},
+            ],
+            'autorizador': {'nombre': 'Supervisor', 'identificacion': 'V3'},
+            'erratas': {'editado': True, 'observacion': 'Cédula corregida'},
+        },
+    ),
+    '006': (
+        {'PERSON_1': {'type_person': VISITOR, 'full_name': 'Carla Ruiz', 'identification_number': 'V4',
+                      'hour': '10:00', 'movement_type': 'employee', 'reason_visit': 'Reunión',
+                      'place_of_reception': 'Lobby', 'assigned_card_number': '7', 'accompany_visitor': 1,
+                      'company_name': 'ACME', 'rif': 'J-1'},
+         'PERSON_2': {'full_name': 'Guardia de turno', 'identification_number': 'V5'},
+         'PERSON_3': {'type_person': UNKNOWN, 'full_name': 'Luis Paz', 'identification_number': 'V6',
+                      'hour': '10:05', 'movement_type': 'visitor', 'reason_visit': 'Entrega'},
+         'SELECTION_4': 'Oficinas',
+         'PERSONS_5': [{'identification_number': 'V7', 'full_name': 'Acompañante', 'assigned_card_number': '8'}],
+         'ERRATA_6': {'edited': False, 'observation_errata': ''}},
+        [{'code': 'PERSON', 'label': 'Visitante'}, {'code': 'SELECTION', 'label': 'Area visitada'},
+         {'code': 'PERSONS', 'label': 'Acompañantes'}, {'code': 'ERRATA', 'label': 'Errata'}],
+        {
+            'personas': [
+                {'tipo_id': VISITOR, 'tipo_descripcion': 'Visitante', 'nombre_completo': 'Carla Ruiz',
+                 'identificacion': 'V4', 'hora': '10:00', 'tipo_movimiento': 'ENTRADA', 'razon_visita': 'Reunión',
+                 'lugar_recepcion': 'Lobby', 'numero_tarjeta': '7', 'fue_acompanado_por_oficial': 1,
+                 'empresa': 'ACME', 'rif': 'J-1'},
+                {'tipo_id': UNKNOWN, 'tipo_descripcion': 'Desconocido', 'nombre_completo': 'Luis Paz',
+                 'identificacion': 'V6', 'hora': '10:05', 'tipo_movimiento': 'SALIDA', 'razon_visita': 'Entrega',
+                 'lugar_recepcion': None, 'numero_tarjeta': None, 'fue_acompanado_por_oficial': 0,
+                 'empresa': '', 'rif': ''},
+            ],
+            # Los acompañantes heredan tipo, movimiento y motivo de la última persona con tipo
+            'personas_adicionales': [
+                {'identificacion': 'V7', 'nombre': 'Acompañante', 'numero_tarjeta': '8',
+                 'tipo_descripcion': 'Desconocido', 'tipo_movimiento': 'SALIDA', 'razon_visita': 'Entrega'},
+            ],
+            'autorizador': {'nombre': 'Guardia de turno', 'identificacion': 'V5'},
+            'area_visitada': 'Oficinas',
+            'erratas': {'editado': False, 'observacion': ''},
+        },
+    ),
+    '007': (
+        {'SELECTION_2': 'Equipo', 'FREE_TEXT_3': 'Laptop', 'SELECTION_5': 'Cajas', 'AMOUNT_8': 2,
+         'SELECTION_7': 'Paletas', 'AMOUNT_10': 0, 'FREE_TEXT_11': 'Reparación', 'SELECTION_12': 'Buena',
+         'AMOUNT_13': 2,
+         'PERSON_14': {'full_name': ' Raúl Vega ', 'identification_number': 'V8', 'company_name': 'Transportes',
+                       'rif': 'J-2', 'hour': '14:00', 'guide_number': 'G-1', 'entry': True},
+         'PERSON_15': {'full_name': 'Gerente ', 'identification_number': 'V9'},
+         'ERRATA_17': {'edited': True, 'observation_errata': 'Cantidad corregida'}},
+        [],
+        {
+            'tipo_activo': 'Equipo',
+            'descripcion_activo': 'Laptop',
+            'unidades_empaque': [{'tipo': 'Cajas', 'cantidad': 2}],
+            'motivo': 'Reparación',
+            'condicion_activo': 'Buena',
+            'cantidad_total': 2,
+            'persona': {'nombre_completo': 'Raúl Vega', 'identificacion': 'V8', 'empresa': 'Transportes',
+                        'rif': 'J-2', 'hora': '14:00', 'numero_guia': 'G-1', 'tipo_movimiento': 'ENTRADA'},
+            'autorizador': {'nombre_completo': 'Gerente', 'identificacion': 'V9'},
+            'erratas': {'editado': True, 'observacion': 'Cantidad corregida'},
+        },
+    ),
+    '0010': (
+        {'FREE_TEXT_1': 'Corte eléctrico', 'DATE_2': '2024-01-31', 'HOUR_3': '22:10',
+         'OESVICA_STAFF_4': [LUIS, MARIA, 'sin datos'], 'ERRATA_6': {'edited': False, 'observation_errata': ''}},
+        [],
+        {
+            'descripcion': 'Corte eléctrico',
+            'hora': '22:10',
+            'personal_involucrado': [{'nombre': 'Luis Gómez', 'codigo_ficha': '101', 'telefono': '04140000001'},
+                                     {'nombre': 'María Rojas', 'codigo_ficha': '102', 'telefono': '04140000002'}],
+        },
+    ),
+}
+
+
+class NoveltyFormattersTest(SimpleTestCase):
+    """ Los formateadores de NoveltyByTypeAPI devuelven lo mismo que el formato anterior """
+
+    def format(self, code, info, template):
+        rows = [('news', 1, CREATED, 'EMP', info, 'digest-' + code)]
+        context = FormatContext(person_types=PERSON_TYPES)
+        return next(format_rows(rows, code, lambda news_id: template, context))[1]
+
+    def test_golden_output(self):
+        for code, (info, template, fields) in GOLDEN.items():
+            with self.subTest(code=code):
+                expected = {'number': 1, 'fecha': '2024-01-31 23:30', 'empleado': 'EMP', **fields}
+                if code == '0010':
+                    # La fecha del formulario reemplaza la de creación
+                    expected['fecha'] = '2024-01-31'
+                data = self.format(code, info, template)
+                self.assertEqual(data, expected)
+                self.assertEqual(list(data), list(expected))
+
+    def test_invalid_date_keeps_original_value(self):
+        # Antes una fecha con otro formato hacía fallar toda la respuesta con InvalidDateException
+        info = dict(GOLDEN['0010'][0], DATE_2='31/01/2024')
+        self.assertEqual(self.format('0010', info, [])['fecha'], '31/01/2024')
+
+    def test_missing_date_keeps_created(self):
+        info = dict(GOLDEN['0010'][0], DATE_2='')
+        self.assertEqual(self.format('0010', info, [])['fecha'], '2024-01-31 23:30')
@@ -0,0 +1,25 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+class BulkCreateMixin:
+    """
+    POST <ruta>/bulk/ con una lista de objetos: los crea con el list_serializer
+    del serializer del viewset (bulk_create y códigos reservados en bloque).
+    """
+    bulk_create_max_size = 5000
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk_create(self, request):
+        if not isinstance(request.data, list):
+            return Response({"error": "Se espera una lista de objetos"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.bulk_create_max_size:
+            return Response(
+                {"error": "Máximo {0} objetos por petición".format(self.bulk_create_max_size)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
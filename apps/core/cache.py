@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+
+VERSION_KEY = 'version:{0}:{1}'
+
+
+def version_cache_key(name, schema_name=None):
+    return VERSION_KEY.format(schema_name or connection.schema_name, name)
+
+
+def get_version(name, schema_name=None):
+    """ Versión actual del contador name en el tenant; forma parte de las claves de cache """
+    key = version_cache_key(name, schema_name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(name, schema_name=None):
+    """
+    Incrementa el contador para invalidar de una vez todas las claves que lo
+    usan. Se hace al confirmar la transacción para que una lectura concurrente
+    no guarde datos viejos bajo la versión nueva.
+    """
+    key = version_cache_key(name, schema_name)
+
+    def incr():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+    transaction.on_commit(incr)
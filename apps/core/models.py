@@ -1,6 +1,8 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
 import jsonfield
 from django_tenants.models import TenantMixin
 from django.utils.translation import ugettext_lazy as _
@@ -76,4 +78,22 @@ class TypeNews(ModelBase):
     is_active = models.BooleanField(default=True)
 
     def __str__(self):
-        return "{description}".format(description=self.description)
\ No newline at end of file
+        return "{description}".format(description=self.description)
+
+
+@receiver(pre_save, sender=TypeNews)
+def track_type_news_description(sender, instance, **kwargs):
+    previous = TypeNews.objects.filter(pk=instance.pk).values_list('description', flat=True).first()
+    instance._description_changed = previous is not None and previous != instance.description
+
+
+@receiver(post_save, sender=TypeNews)
+def refresh_news_search_document(sender, instance, created, **kwargs):
+    # La descripción forma parte del documento de búsqueda de las novedades de
+    # todos los tenants, que un trigger no puede alcanzar
+    if created or not getattr(instance, '_description_changed', False):
+        return
+    from apps.main.tasks import rebuild_news_search_document
+
+    type_news_id = str(instance.pk)
+    transaction.on_commit(lambda: rebuild_news_search_document.delay(type_news_id))
@@ -0,0 +1,47 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset): páginas de costo constante sin COUNT(*).
+    Las subclases definen `ordering`; el primer campo debe estar indexado y
+    ser (casi) único, el resto desempata.
+    """
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+
+class NewsCursorPagination(KeysetCursorPagination):
+    ordering = ('-number', '-id')
+
+
+class PersonCursorPagination(KeysetCursorPagination):
+    ordering = ('code', 'id')
+
+
+class FacialRecognitionEventCursorPagination(KeysetCursorPagination):
+    ordering = ('-event_time', '-id')
+
+
+class CursorPaginationMixin:
+    """
+    Habilita ?pagination=cursor en un viewset que por defecto pagina con
+    limit/offset. El viewset define `cursor_pagination_class`.
+    """
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        return (
+            self.cursor_pagination_class is not None and
+            self.request is not None and
+            self.request.query_params.get('pagination') == 'cursor'
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class is not None else None
+        return self._paginator
@@ -0,0 +1,23 @@
+from import_export.resources import ModelResource
+
+
+class BulkModelResource(ModelResource):
+    """
+    ModelResource que guarda con bulk_create/bulk_update en bloques de
+    batch_size filas. Solo para modelos sin save() propio, señales ni campos
+    ManyToMany, que el modo bulk no ejecuta.
+
+    import_export registra y descarta los errores de un bloque; aquí se
+    propagan para que la importación no pierda filas en silencio.
+    """
+
+    def bulk_create(self, using_transactions, dry_run, raise_errors, batch_size=None):
+        super().bulk_create(using_transactions, dry_run, True, batch_size=batch_size)
+
+    def bulk_update(self, using_transactions, dry_run, raise_errors, batch_size=None):
+        super().bulk_update(using_transactions, dry_run, True, batch_size=batch_size)
+
+    class Meta:
+        use_bulk = True
+        batch_size = 1000
+        skip_diff = True
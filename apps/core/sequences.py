@@ -0,0 +1,33 @@
+from django.db import connections, router
+from sequences.models import Sequence
+
+POSTGRESQL_UPSERT_BLOCK = """
+        INSERT INTO {db_table} (name, last)
+             VALUES (%s, %s)
+        ON CONFLICT (name)
+      DO UPDATE SET last = {db_table}.last + %s
+          RETURNING last;
+"""
+
+
+def get_next_values(sequence_name='default', count=1, initial_value=1, *, using=None):
+    """
+    Reserva `count` valores consecutivos de una secuencia de django-sequences
+    en una sola sentencia y los retorna como range. Equivale a llamar
+    `count` veces a sequences.get_next_value.
+    """
+    if count <= 0:
+        return range(0)
+
+    if using is None:
+        using = router.db_for_write(Sequence)
+
+    connection = connections[using]
+    db_table = connection.ops.quote_name(Sequence._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            POSTGRESQL_UPSERT_BLOCK.format(db_table=db_table),
+            [sequence_name, initial_value + count - 1, count]
+        )
+        last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
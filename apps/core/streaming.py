@@ -0,0 +1,73 @@
+import json
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON = 'ndjson'
+JSON = 'json'
+
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    JSON: 'application/json',
+}
+
+
+class StreamingListMixin:
+    """
+    Con ?not_paginator=1&stream=ndjson|json el listado se envía como
+    StreamingHttpResponse: el queryset se recorre con .iterator() y se
+    serializa por bloques, por lo que la memoria del worker no depende de la
+    cantidad de filas.
+
+    Los viewsets que sobrescriben list() deben consultar stream_requested()
+    y retornar stream_response(queryset) con el queryset ya filtrado.
+    """
+    stream_chunk_size = 500
+
+    def get_stream_format(self):
+        if not self.request.query_params.get('not_paginator', None):
+            return None
+        stream = self.request.query_params.get('stream', None)
+        return stream if stream in CONTENT_TYPES else None
+
+    def stream_requested(self):
+        return self.get_stream_format() is not None
+
+    def iter_stream_rows(self, queryset):
+        # iterator() ignora prefetch_related, se aplica manualmente por bloque
+        prefetch_lookups = queryset._prefetch_related_lookups
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                return
+            if prefetch_lookups:
+                prefetch_related_objects(chunk, *prefetch_lookups)
+            yield from serializer_class(chunk, many=True, context=context).data
+
+    def stream_response(self, queryset):
+        stream_format = self.get_stream_format()
+        rows = self.iter_stream_rows(queryset)
+        if stream_format == NDJSON:
+            content = (json.dumps(row, cls=JSONEncoder) + '\n' for row in rows)
+        else:
+            content = self.iter_json_array(rows)
+        return StreamingHttpResponse(content, content_type=CONTENT_TYPES[stream_format])
+
+    @staticmethod
+    def iter_json_array(rows):
+        yield '['
+        separator = ''
+        for row in rows:
+            yield separator + json.dumps(row, cls=JSONEncoder)
+            separator = ','
+        yield ']'
+
+    def list(self, request, *args, **kwargs):
+        if self.stream_requested():
+            return self.stream_response(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
@@ -1,4 +1,3 @@
-import tablib
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
@@ -6,17 +5,20 @@ from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from tablib import Dataset
 
 from .admin import TypeNewsResource
 from .serializers import TypeNewsDefaultSerializer
 
 from apps.core.models import TypeNews, CODES_TEMPLATES
+from apps.core.exports import ExportMixin
+from apps.core.streaming import StreamingListMixin
+from apps.setting.imports import ImportMixin
 
 
-class TypeNewsViewSet(ModelViewSet):
+class TypeNewsViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = TypeNews.objects.filter(is_active=True)
     serializer_class = TypeNewsDefaultSerializer
+    export_resource_class = TypeNewsResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['description']
     permission_classes = (AllowAny, )
@@ -24,6 +26,8 @@ class TypeNewsViewSet(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
         filtered = self.request.query_params.get('filtered', None)
 
         if filtered:
@@ -49,62 +53,3 @@ class TypeNewsViewSet(ModelViewSet):
     @action(methods=['GET'], detail=False)
     def codes_template(self, request):
         return Response(CODES_TEMPLATES, status=status.HTTP_200_OK)
-
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = TypeNewsResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = TypeNewsResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
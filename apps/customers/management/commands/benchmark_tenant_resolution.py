@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.customers.models import Client
+from newsbookbackend.middlewares import XHeaderTenantMiddleware
+from newsbookbackend.tenant_registry import registry
+
+
+class Command(BaseCommand):
+    help = "Compara peticiones por segundo del XHeaderTenantMiddleware con y sin el registro de tenants"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Schema a resolver (por defecto el primer tenant no público)")
+        parser.add_argument('--requests', type=int, default=5000, help="Peticiones por escenario")
+
+    def handle(self, *args, **options):
+        schema_name = options['schema']
+        total = options['requests']
+        if not schema_name:
+            client = Client.objects.exclude(schema_name='public').first()
+            if client is None:
+                raise CommandError("No hay tenants para ejecutar el benchmark")
+            schema_name = client.schema_name
+
+        middleware = XHeaderTenantMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+
+        def run():
+            started = time.perf_counter()
+            for _ in range(total):
+                request = factory.get('/api/main/news/', HTTP_X_DTS_SCHEMA=schema_name)
+                middleware.process_request(request)
+            return total / (time.perf_counter() - started)
+
+        enabled = registry.enabled
+        try:
+            registry.enabled = False
+            before = run()
+
+            registry.enabled = True
+            registry.invalidate()
+            registry.reset_stats()
+            after = run()
+            stats = registry.stats()
+        finally:
+            registry.enabled = enabled
+            connection.set_schema_to_public()
+
+        self.stdout.write("Schema: {0} - {1} peticiones por escenario".format(schema_name, total))
+        self.stdout.write("Sin registro: {0:.0f} req/s".format(before))
+        self.stdout.write("Con registro: {0:.0f} req/s (x{1:.1f})".format(after, after / before))
+        self.stdout.write("Aciertos: {hits} - Fallos: {misses} - Ratio: {hit_ratio}".format(**stats))
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_client_facial_recognition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='facial_events_retention_months',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Meses de eventos de reconocimiento facial a conservar (vacío = sin límite)', null=True, verbose_name='facial events retention months'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='facial_events_archive',
+            field=models.BooleanField(default=True, help_text='Guardar en un archivo comprimido las particiones vencidas antes de eliminarlas', verbose_name='archive facial events'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from email.policy import default
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.dispatch.dispatcher import receiver
 from django_tenants.migration_executors.base import run_migrations
 from django_tenants.models import TenantMixin, DomainMixin
@@ -11,6 +12,7 @@ from django.utils.translation import ugettext_lazy as _
 from apps.core.models import TypeNews
 from apps.security.models import User
 from django_tenants_celery_beat.models import TenantTimezoneMixin
+from newsbookbackend.tenant_registry import registry
 
 
 class Client(TenantTimezoneMixin, TenantMixin):
@@ -21,6 +23,14 @@ class Client(TenantTimezoneMixin, TenantMixin):
     email = models.EmailField(null=True)
     type_news = models.ManyToManyField(TypeNews, related_name='clients', verbose_name=_('type news'))
     facial_recognition = models.BooleanField(verbose_name=_('facial recognition'), default=False)
+    facial_events_retention_months = models.PositiveSmallIntegerField(
+        verbose_name=_('facial events retention months'), null=True, blank=True,
+        help_text="Meses de eventos de reconocimiento facial a conservar (vacío = sin límite)"
+    )
+    facial_events_archive = models.BooleanField(
+        verbose_name=_('archive facial events'), default=True,
+        help_text="Guardar en un archivo comprimido las particiones vencidas antes de eliminarlas"
+    )
 
     # default true, schema will be automatically created and synced when it is saved
     auto_create_schema = True
@@ -51,4 +61,17 @@ def handle_schema_migrated(sender, **kwargs):
             user.set_password("admin")
             user.save()
     except:
-        pass
\ No newline at end of file
+        pass
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client_registry(sender, instance, **kwargs):
+    registry.publish_invalidation(instance.schema_name)
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_domain_registry(sender, instance, **kwargs):
+    # El hostname pudo cambiar de tenant, por lo que se invalida todo el registro
+    registry.publish_invalidation()
@@ -60,8 +60,13 @@ class ClientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
                     instance.on_trial = on_trial
                 if facial_recognition:
                     instance.facial_recognition = facial_recognition
+                # Se permite vaciar la retención (sin límite)
+                for field in ('facial_events_retention_months', 'facial_events_archive'):
+                    if field in validated_data:
+                        setattr(instance, field, validated_data.pop(field))
 
-                instance.save(update_fields=['name', 'email', 'paid_until', 'on_trial', 'facial_recognition'])
+                instance.save(update_fields=['name', 'email', 'paid_until', 'on_trial', 'facial_recognition',
+                                             'facial_events_retention_months', 'facial_events_archive'])
 
                 if email:
                     try:
@@ -80,7 +85,7 @@ class ClientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Client
         fields = ('id', 'name', 'paid_until', 'on_trial', 'created_on', 'email', 'auto_create_schema', 'schema_name',
-                  'type_news', 'facial_recognition',)
+                  'type_news', 'facial_recognition', 'facial_events_retention_months', 'facial_events_archive',)
 
 
 class DomainSerializer(DynamicFieldsMixin, serializers.Serializer):
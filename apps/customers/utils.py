@@ -0,0 +1,22 @@
+from django.db import connections
+from django_tenants.utils import get_tenant_database_alias, get_tenant_model
+
+
+def iter_tenants(schema_name=None):
+    """
+    Recorre los tenants activando el schema de cada uno en la conexión.
+    Al finalizar la conexión vuelve al schema público.
+    """
+    connection = connections[get_tenant_database_alias()]
+    connection.set_schema_to_public()
+    queryset = get_tenant_model().objects.all().order_by('schema_name')
+    if schema_name:
+        queryset = queryset.filter(schema_name=schema_name)
+    tenants = list(queryset)
+
+    try:
+        for tenant in tenants:
+            connection.set_tenant(tenant)
+            yield tenant
+    finally:
+        connection.set_schema_to_public()
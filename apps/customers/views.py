@@ -9,11 +9,12 @@ from .models import Client, Domain
 from .serializers import ClientSerializer, DomainSerializer
 from django.db import connections
 from django_tenants.utils import get_tenant_database_alias
+from apps.core.streaming import StreamingListMixin
 from apps.customers.models import Client
 from apps.main.models import TypePerson
 from rest_framework import status, mixins
 
-class ClientViewSet(ModelViewSet):
+class ClientViewSet(StreamingListMixin, ModelViewSet):
     serializer_class = ClientSerializer
     queryset = Client.objects.all()
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -23,6 +24,8 @@ class ClientViewSet(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -79,7 +82,7 @@ class ClientViewSet(ModelViewSet):
 
         return Response({}, status=status.HTTP_200_OK)
 
-class DomainViewSet(ModelViewSet):
+class DomainViewSet(StreamingListMixin, ModelViewSet):
     serializer_class = DomainSerializer
     queryset = Domain.objects.all()
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -89,6 +92,8 @@ class DomainViewSet(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
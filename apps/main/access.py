@@ -0,0 +1,251 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+
+from apps.core.cache import get_version
+from apps.main.models import AccessEntry, Person
+from apps.main.serializers import AccessEntrySerializer, PersonDefaultSerializer
+from apps.setting.models import FacialRecognitionEvent
+from apps.setting.serializers import FacialRecognitionEventSerializer
+
+RULES_VERSION = 'access-rules'
+RULES_CACHE_TIMEOUT = 60 * 60 * 24
+
+WEEK_DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+ALL_WEEK_DAYS = (1 << len(WEEK_DAYS)) - 1
+
+# Un día del mes (1-31) y un día de la semana siempre coinciden dentro de este rango
+MAX_LOOKAHEAD_DAYS = 62
+
+GATE_CHECK_MAX_SIZE = 500
+
+RULE_FIELDS = ('id', 'access_type', 'date_start', 'date_end', 'start_time', 'end_time', 'week_days', 'specific_days')
+
+
+def week_days_mask(week_days):
+    """ Bitmask (lunes = bit 0) a partir de los nombres guardados en AccessEntry.week_days """
+    mask = 0
+    for name in week_days or ():
+        try:
+            mask |= 1 << WEEK_DAYS.index(str(name).strip().lower())
+        except ValueError:
+            continue
+    return mask
+
+
+def month_days_mask(specific_days):
+    """ Bitmask (día 1 = bit 1) a partir de AccessEntry.specific_days """
+    mask = 0
+    for day in specific_days or ():
+        try:
+            day = int(day)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= day <= 31:
+            mask |= 1 << day
+    return mask
+
+
+class AccessRule(namedtuple('AccessRule', (
+        'entry_id', 'date_start', 'date_end', 'week_days', 'month_days', 'start_time', 'end_time'))):
+    """
+    AccessEntry normalizado: rango de fechas, días de la semana y del mes como
+    bitmask y ventana horaria. Un acceso simple es un recurrente que aplica
+    todos los días de su rango.
+    """
+    __slots__ = ()
+
+    def matches_date(self, day):
+        if not self.date_start <= day <= self.date_end:
+            return False
+        return bool(self.week_days & (1 << day.weekday()) or self.month_days & (1 << day.day))
+
+    def is_allowed(self, now):
+        return self.matches_date(now.date()) and self.start_time <= now.time() <= self.end_time
+
+    def windows(self, first_day, last_day):
+        """ Ventanas [fecha, inicio, fin] del rango indicado """
+        day = max(first_day, self.date_start)
+        last_day = min(last_day, self.date_end)
+        while day <= last_day:
+            if self.matches_date(day):
+                yield day, self.start_time, self.end_time
+            day += timedelta(days=1)
+
+    def next_window(self, now):
+        """ Inicio de la próxima ventana que aún no terminó, o None si ya no hay más """
+        today = now.date()
+        day = max(today, self.date_start)
+        if day == today and now.time() > self.end_time:
+            day += timedelta(days=1)
+        last_day = min(self.date_end, day + timedelta(days=MAX_LOOKAHEAD_DAYS))
+        while day <= last_day:
+            if self.matches_date(day):
+                return datetime.combine(day, self.start_time)
+            day += timedelta(days=1)
+        return None
+
+
+def compile_rule(entry_id, access_type, date_start, date_end, start_time, end_time, week_days, specific_days):
+    if access_type == AccessEntry.SINGLE:
+        if not date_start or not date_end:
+            return None
+        week_mask, month_mask = ALL_WEEK_DAYS, 0
+    else:
+        week_mask, month_mask = week_days_mask(week_days), month_days_mask(specific_days)
+        if not week_mask and not month_mask:
+            return None
+    return AccessRule(
+        entry_id=entry_id,
+        date_start=date_start or date.min,
+        date_end=date_end or date.max,
+        week_days=week_mask,
+        month_days=month_mask,
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+
+def rules_cache_key(person_id, version):
+    return 'access-rules:{0}:{1}:{2}'.format(connection.schema_name, version, person_id)
+
+
+def get_persons_rules(person_ids):
+    """
+    Reglas compiladas de los accesos de cada persona y de sus grupos. Se leen
+    de la cache en un solo get_many y las faltantes se compilan con dos
+    consultas para todo el lote.
+    """
+    version = get_version(RULES_VERSION)
+    keys = {person_id: rules_cache_key(person_id, version) for person_id in person_ids}
+    cached = cache.get_many(keys.values())
+    rules = {person_id: cached[key] for person_id, key in keys.items() if key in cached}
+
+    missing = [person_id for person_id in keys if person_id not in rules]
+    if missing:
+        entries = {person_id: {} for person_id in missing}
+        for relation in ('persons', 'group__persons'):
+            for person_id, *values in AccessEntry.objects.filter(
+                    **{relation + '__in': missing}).values_list(relation, *RULE_FIELDS):
+                entries[person_id][values[0]] = values
+        compiled = {}
+        for person_id, values in entries.items():
+            rules[person_id] = compiled[keys[person_id]] = tuple(
+                rule for rule in (compile_rule(*v) for v in values.values()) if rule is not None
+            )
+        cache.set_many(compiled, timeout=RULES_CACHE_TIMEOUT)
+    return rules
+
+
+def get_person_rules(person_id):
+    return get_persons_rules([person_id])[person_id]
+
+
+AccessVerdict = namedtuple('AccessVerdict', ('has_access', 'entry_id', 'next_entry_id', 'next_window'))
+
+
+def evaluate(rules, now):
+    """ En una sola pasada: la regla que permite el acceso ahora o, si no hay, la próxima ventana """
+    next_rule, next_start = None, None
+    for rule in rules:
+        if rule.is_allowed(now):
+            return AccessVerdict(True, rule.entry_id, None, None)
+        start = rule.next_window(now)
+        if start is not None and (next_start is None or start < next_start):
+            next_rule, next_start = rule, start
+    return AccessVerdict(False, None, next_rule.entry_id if next_rule else None, next_start)
+
+
+def check_access(person_id, now=None):
+    return evaluate(get_person_rules(person_id), now or datetime.now())
+
+
+def gate_check(identifications, facial_recognition, now=None):
+    """
+    Veredicto de acceso por documento de identidad, con la misma forma que
+    PersonViewSet.get_person_by_identification. Personas, eventos faciales
+    recientes, reglas y accesos a mostrar se resuelven con consultas por lote.
+    """
+    now = now or datetime.now()
+    persons = {person.doc_ident: person for person in Person.objects.filter(
+        doc_ident__in=identifications).select_related('type_person')}
+    data = dict(zip(persons, PersonDefaultSerializer(list(persons.values()), many=True).data))
+
+    events = {}
+    if facial_recognition:
+        # El evento más antiguo de los últimos 5 minutos por documento, como .last() con ordering -event_time
+        events = {event.user_id: event for event in FacialRecognitionEvent.objects.recent().filter(
+            user_id__in=identifications
+        ).order_by('user_id', 'event_time', 'id').distinct('user_id')}
+
+    verdicts = {}
+    to_check = [person.id for person in persons.values()
+                if not person.blacklist and person.type_person.requires_access_verification]
+    if to_check:
+        rules = get_persons_rules(to_check)
+        verdicts = {person_id: evaluate(rules[person_id], now) for person_id in to_check}
+    entry_ids = {verdict.entry_id or verdict.next_entry_id for verdict in verdicts.values()} - {None}
+    entries = {}
+    if entry_ids:
+        entries = {entry.id: AccessEntrySerializer(entry).data for entry in AccessEntry.objects.filter(
+            id__in=entry_ids).select_related('group').prefetch_related(
+            'persons__type_person', 'group__persons__type_person')}
+
+    results = []
+    for identification in identifications:
+        person = persons.get(identification)
+        result = {"identification": identification}
+        if facial_recognition and identification not in events:
+            result.update({
+                "person": data.get(identification),
+                "blacklist": False,
+                "has_access": False,
+                "message": "No se ha detectado un reconocimiento facial reciente"
+            })
+        elif not person:
+            result.update({
+                "person": None,
+                "blacklist": False,
+                "recognition_event_data": FacialRecognitionEventSerializer(events.get(identification)).data,
+                "has_access": facial_recognition,
+                "message": "La persona no existe"
+            })
+        elif person.blacklist:
+            result.update({
+                "person": data[identification],
+                "blacklist": True,
+                "has_access": False,
+                "message": "Persona bloqueada"
+            })
+        elif person.id in verdicts:
+            verdict = verdicts[person.id]
+            if verdict.has_access:
+                result.update({
+                    "person": data[identification],
+                    "blacklist": False,
+                    "has_access": True,
+                    "access_details": entries.get(verdict.entry_id),
+                    "message": "Acceso permitido",
+                    "access_list": []
+                })
+            else:
+                next_access = entries.get(verdict.next_entry_id)
+                result.update({
+                    "person": data[identification],
+                    "blacklist": False,
+                    "has_access": False,
+                    "message": "No tiene acceso permitido en este momento",
+                    "access_list": [next_access] if next_access else []
+                })
+        else:
+            result.update({
+                "person": data[identification],
+                "blacklist": False,
+                "has_access": True,
+                "message": "",
+                "access_list": []
+            })
+        results.append(result)
+    return results
@@ -4,16 +4,57 @@ from import_export.resources import ModelResource
 from django_tenants.admin import TenantAdminMixin
 
 # Register your models here.
-from apps.main.models import TypePerson, Material, Vehicle, Person, News, Schedule, Location, Point
+from apps.core.cache import bump_version
+from apps.core.resources import BulkModelResource
+from apps.main.models import TypePerson, Material, Vehicle, Person, News, Schedule, Location, Point, \
+    get_auto_codes_material, get_auto_codes_person
+
+
+def fill_missing_codes(dataset, fields, allocate_codes):
+    """ Completa los códigos vacíos del dataset reservándolos en bloque """
+    columns = {
+        field: list(dataset[field]) if field in dataset.headers else [None] * len(dataset)
+        for field in fields
+    }
+    missing = [i for i in range(len(dataset)) if any(columns[field][i] in (None, "") for field in fields)]
+    if not missing:
+        return
+    for i, code in zip(missing, allocate_codes(len(missing))):
+        for field in fields:
+            if columns[field][i] in (None, ""):
+                columns[field][i] = code
+    for field, values in columns.items():
+        if field in dataset.headers:
+            del dataset[field]
+        dataset.append_col(values, header=field)
+
+
+class CatalogResource(BulkModelResource):
+    """
+    El modo bulk no envía post_save, así que invalidate_catalogs no se entera
+    de la importación; se invalida el catálogo una vez al terminar. Si la
+    transacción se revierte, bump_version no llega a ejecutarse.
+    """
+
+    def after_import(self, dataset, result, using_transactions, dry_run, **kwargs):
+        from apps.main.catalogs import CATALOGS
+
+        super().after_import(dataset, result, using_transactions, dry_run, **kwargs)
+        if not dry_run:
+            catalog = CATALOGS[self._meta.model]
+            bump_version(catalog.version_name, catalog.schema_name())
+
+
+class PersonResource(BulkModelResource):
+    def before_import(self, dataset, using_transactions, dry_run, **kwargs):
+        fill_missing_codes(dataset, ('code',), get_auto_codes_person)
 
-
-class PersonResource(ModelResource):
     class Meta:
         model = Person
         exclude = ('id', 'created', 'updated',)
 
 
-class TypePersonResource(ModelResource):
+class TypePersonResource(CatalogResource):
     class Meta:
         model = TypePerson
         exclude = ('id', 'created', 'updated',)
@@ -22,36 +63,39 @@ class TypePersonResource(ModelResource):
 class NewsResource(ModelResource):
     class Meta:
         model = News
-        exclude = ('id', 'created', 'updated',)
+        exclude = ('id', 'created', 'updated', 'search_document', 'has_attachments', 'person_type_ids',)
 
 
-class VehicleResource(ModelResource):
+class VehicleResource(BulkModelResource):
     class Meta:
         model = Vehicle
         exclude = ('id', 'created', 'updated',)
 
 
-class MaterialResource(ModelResource):
+class MaterialResource(BulkModelResource):
+    def before_import(self, dataset, using_transactions, dry_run, **kwargs):
+        fill_missing_codes(dataset, ('code', 'serial'), get_auto_codes_material)
+
     class Meta:
         model = Material
         exclude = ('id', 'created', 'updated',)
 
 
-class ScheduleResource(ModelResource):
+class ScheduleResource(CatalogResource):
     class Meta:
         model = Schedule
         exclude = ('id', 'created', 'updated',)
 
 
-class LocationResource(ModelResource):
+class LocationResource(CatalogResource):
     class Meta:
         model = Location
         exclude = ('id', 'created', 'updated',)
 
 
-class PointResource(ModelResource):
+class PointResource(BulkModelResource):
     class Meta:
-        model = Location
+        model = Point
         exclude = ('id', 'created', 'updated',)
 
 
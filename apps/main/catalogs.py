@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection
+from django_tenants.utils import get_public_schema_name
+
+from apps.core.cache import get_version
+from apps.core.models import TypeNews
+from apps.main.models import Location, Schedule, TypePerson
+
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_CACHE_SIZE = 256
+
+
+class LocalCache:
+    """ LRU del proceso; las claves incluyen la versión, así que nunca devuelve datos invalidados """
+
+    def __init__(self, size):
+        self.size = size
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+
+local_cache = LocalCache(LOCAL_CACHE_SIZE)
+
+
+def build_map(queryset, *fields):
+    return {str(row.pop('id')): row for row in queryset.values('id', *fields)}
+
+
+class Catalog:
+    """
+    Catálogo pequeño de un modelo, como dict por id, cacheado por tenant. La
+    clave incluye el contador de versión del catálogo, que incrementan los
+    post_save/post_delete del modelo (ver invalidate_catalogs en
+    apps.main.models). Los modelos compartidos usan el schema público.
+    El dict devuelto es compartido: no se debe modificar.
+    """
+
+    def __init__(self, name, model, build, shared=False):
+        self.name = name
+        self.model = model
+        self.build = build
+        self.shared = shared
+
+    @property
+    def version_name(self):
+        return 'catalog-' + self.name
+
+    def schema_name(self):
+        return get_public_schema_name() if self.shared else connection.schema_name
+
+    def version(self):
+        return get_version(self.version_name, self.schema_name())
+
+    def get(self):
+        schema_name = self.schema_name()
+        key = 'catalog:{0}:{1}:{2}'.format(schema_name, self.name, get_version(self.version_name, schema_name))
+        data = local_cache.get(key)
+        if data is None:
+            data = cache.get(key)
+            if data is None:
+                data = self.build()
+                cache.set(key, data, timeout=CATALOG_CACHE_TIMEOUT)
+            local_cache.set(key, data)
+        return data
+
+
+def build_person_types():
+    return {
+        str(tp.id): {
+            'descripcion': tp.description,
+            'prioridad': tp.priority,
+            'es_institucion': tp.is_institution,
+            'requiere_datos_empresa': tp.requires_company_data
+        }
+        for tp in TypePerson.objects.filter(is_active=True)
+    }
+
+
+PERSON_TYPES = Catalog('person-types', TypePerson, build_person_types)
+TYPE_NEWS = Catalog('type-news', TypeNews, lambda: build_map(
+    TypeNews.objects.all(), 'code', 'description', 'is_changing_of_the_guard', 'is_active'), shared=True)
+LOCATIONS = Catalog('locations', Location, lambda: build_map(
+    Location.objects.all(), 'code', 'name', 'is_active'))
+SCHEDULES = Catalog('schedules', Schedule, lambda: build_map(
+    Schedule.objects.all(), 'description', 'start_time', 'final_hour', 'is_active'))
+
+CATALOGS = {catalog.model: catalog for catalog in (PERSON_TYPES, TYPE_NEWS, LOCATIONS, SCHEDULES)}
+
+
+def get_person_types_map():
+    """ Tipos de persona activos por id """
+    return PERSON_TYPES.get()
+
+
+def get_type_news_map():
+    return TYPE_NEWS.get()
+
+
+def get_locations_map():
+    return LOCATIONS.get()
+
+
+def get_schedules_map():
+    return SCHEDULES.get()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.customers.utils import iter_tenants
+from apps.main.models import News
+
+
+class Command(BaseCommand):
+    help = "Calcula has_attachments y person_type_ids de las novedades existentes en todos los schemas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas por lote")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for tenant in iter_tenants(options['schema']):
+            updated = 0
+            batch = []
+            queryset = News.objects.only('id', 'info', *News.FEATURE_FIELDS).order_by('id')
+            for news in queryset.iterator(chunk_size=batch_size):
+                has_attachments = news.compute_has_attachments()
+                person_type_ids = news.compute_person_type_ids()
+                if has_attachments == news.has_attachments and person_type_ids == news.person_type_ids:
+                    continue
+                news.has_attachments = has_attachments
+                news.person_type_ids = person_type_ids
+                batch.append(news)
+                if len(batch) >= batch_size:
+                    updated += self.flush(batch)
+            updated += self.flush(batch)
+            self.stdout.write(self.style.SUCCESS("%s: %s novedades actualizadas" % (tenant.schema_name, updated)))
+
+    @staticmethod
+    def flush(batch):
+        count = len(batch)
+        if batch:
+            News.objects.bulk_update(batch, News.FEATURE_FIELDS)
+            batch.clear()
+        return count
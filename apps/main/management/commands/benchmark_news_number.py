@@ -0,0 +1,89 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from sequences import get_next_value
+
+from apps.core.models import TypeNews
+from apps.customers.models import Client
+from apps.main.models import News
+
+BENCHMARK_SEQUENCE = 'main_news_number_benchmark_seq'
+BENCHMARK_COUNTER = 'order-benchmark'
+
+
+class Command(BaseCommand):
+    help = ("Compara inserciones de novedades por segundo con escritores concurrentes usando el contador "
+            "de django-sequences (antes) y una secuencia nativa (después). Las novedades se revierten.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Schema donde ejecutar (por defecto el primer tenant no público)")
+        parser.add_argument('--writers', type=int, default=50, help="Escritores en paralelo")
+        parser.add_argument('--inserts', type=int, default=20, help="Inserciones por escritor")
+        parser.add_argument('--work', type=float, default=0.005,
+                            help="Segundos de trabajo simulado dentro de la transacción tras asignar el número")
+
+    def handle(self, *args, **options):
+        schema_name = options['schema']
+        queryset = Client.objects.exclude(schema_name='public')
+        tenant = queryset.filter(schema_name=schema_name).first() if schema_name else queryset.first()
+        if tenant is None:
+            raise CommandError("No hay tenants para ejecutar el benchmark")
+        connection.set_tenant(tenant)
+
+        type_news = TypeNews.objects.first()
+        if type_news is None:
+            raise CommandError("Se necesita al menos un tipo de novedad")
+
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE SEQUENCE IF NOT EXISTS %s" % BENCHMARK_SEQUENCE)
+        try:
+            for label, allocate in (
+                ("django-sequences (antes)", lambda: get_next_value(BENCHMARK_COUNTER)),
+                ("secuencia nativa (después)", self.nextval),
+            ):
+                rate = self.run(tenant, type_news, allocate, options)
+                self.stdout.write("%s: %.1f inserciones/s" % (label, rate))
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("DROP SEQUENCE IF EXISTS %s" % BENCHMARK_SEQUENCE)
+                cursor.execute("DELETE FROM sequences_sequence WHERE name = %s", [BENCHMARK_COUNTER])
+
+    @staticmethod
+    def nextval():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval('%s')" % BENCHMARK_SEQUENCE)
+            return cursor.fetchone()[0]
+
+    def run(self, tenant, type_news, allocate, options):
+        barrier = threading.Barrier(options['writers'])
+        errors = []
+
+        def writer():
+            connection.set_tenant(tenant)
+            try:
+                barrier.wait()
+                for _ in range(options['inserts']):
+                    # Igual que NewsDefaultSerializer.create: el número se asigna
+                    # dentro de la transacción de la novedad
+                    with transaction.atomic():
+                        News.objects.create(number=allocate(), type_news=type_news, employee='benchmark')
+                        time.sleep(options['work'])
+                        transaction.set_rollback(True)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError("Error en un escritor: %s" % errors[0])
+        return options['writers'] * options['inserts'] / elapsed
@@ -0,0 +1,63 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.customers.utils import iter_tenants
+
+COPY_BATCH_SQL = """
+WITH batch AS (
+    SELECT id FROM main_news
+    WHERE id > %s AND (info_jsonb IS NULL OR template_jsonb IS NULL)
+    ORDER BY id
+    LIMIT %s
+)
+UPDATE main_news AS news
+SET info_jsonb = main_news_to_jsonb(news.info::text),
+    template_jsonb = main_news_to_jsonb(news.template::text)
+FROM batch
+WHERE news.id = batch.id
+RETURNING news.id
+"""
+
+
+class Command(BaseCommand):
+    help = "Copia en lotes info/template de main_news a las columnas jsonb creadas por la migración 0027"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas por lote")
+        parser.add_argument('--sleep', type=float, default=0, help="Pausa en segundos entre lotes")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for tenant in iter_tenants(options['schema']):
+            if not self.has_pending_columns():
+                self.stdout.write("%s: sin columnas jsonb pendientes, se omite" % tenant.schema_name)
+                continue
+
+            copied = 0
+            last_id = uuid.UUID(int=0)
+            while True:
+                # Cada lote se confirma por separado para no retener bloqueos
+                with connection.cursor() as cursor:
+                    cursor.execute(COPY_BATCH_SQL, [last_id, batch_size])
+                    ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                copied += len(ids)
+                last_id = max(ids)
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+
+            self.stdout.write(self.style.SUCCESS("%s: %s novedades copiadas" % (tenant.schema_name, copied)))
+
+    @staticmethod
+    def has_pending_columns():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'main_news' AND column_name = 'info_jsonb'"
+            )
+            return cursor.fetchone() is not None
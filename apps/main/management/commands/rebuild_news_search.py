@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.customers.utils import iter_tenants
+from apps.main.search import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    help = "Recalcula el documento de búsqueda (search_document) de las novedades"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+        parser.add_argument('--type-news', help="Procesar solo las novedades de este tipo (id)")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas por lote")
+
+    def handle(self, *args, **options):
+        for tenant in iter_tenants(options['schema']):
+            total = rebuild_search_documents(options['type_news'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS("%s: %s novedades actualizadas" % (tenant.schema_name, total)))
@@ -0,0 +1,63 @@
+# Primera fase de la migración de News.info y News.template a jsonb.
+#
+# Agrega las columnas jsonb (nulas, sin reescribir la tabla) y un trigger que las
+# mantiene sincronizadas con las escrituras. Las filas existentes se copian en
+# lotes con `python manage.py migrate_news_jsonb` antes de aplicar la 0028.
+
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE OR REPLACE FUNCTION main_news_to_jsonb(value text) RETURNS jsonb AS $$
+DECLARE
+    result jsonb;
+BEGIN
+    IF value IS NULL OR value = '' THEN
+        RETURN NULL;
+    END IF;
+    result := value::jsonb;
+    -- jsonfield guardaba algunos valores doblemente serializados (un string JSON)
+    IF jsonb_typeof(result) = 'string' THEN
+        BEGIN
+            result := (result #>> '{}')::jsonb;
+        EXCEPTION WHEN invalid_text_representation THEN
+            NULL;
+        END;
+    END IF;
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+ALTER TABLE main_news ADD COLUMN info_jsonb jsonb NULL;
+ALTER TABLE main_news ADD COLUMN template_jsonb jsonb NULL;
+
+CREATE OR REPLACE FUNCTION main_news_sync_jsonb() RETURNS trigger AS $$
+BEGIN
+    NEW.info_jsonb := main_news_to_jsonb(NEW.info::text);
+    NEW.template_jsonb := main_news_to_jsonb(NEW.template::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_news_sync_jsonb
+    BEFORE INSERT OR UPDATE OF info, template ON main_news
+    FOR EACH ROW EXECUTE PROCEDURE main_news_sync_jsonb();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS main_news_sync_jsonb ON main_news;
+DROP FUNCTION IF EXISTS main_news_sync_jsonb();
+ALTER TABLE main_news DROP COLUMN IF EXISTS info_jsonb;
+ALTER TABLE main_news DROP COLUMN IF EXISTS template_jsonb;
+DROP FUNCTION IF EXISTS main_news_to_jsonb(text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_person_sex'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
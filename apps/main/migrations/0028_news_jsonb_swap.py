@@ -0,0 +1,59 @@
+# Segunda fase: completa las filas pendientes (si no se ejecutó migrate_news_jsonb
+# se copian todas aquí), reemplaza las columnas de texto por las jsonb y elimina
+# el trigger de sincronización.
+
+from django.db import migrations, models
+
+FORWARD_SQL = """
+DROP TRIGGER IF EXISTS main_news_sync_jsonb ON main_news;
+DROP FUNCTION IF EXISTS main_news_sync_jsonb();
+
+UPDATE main_news
+SET info_jsonb = main_news_to_jsonb(info::text),
+    template_jsonb = main_news_to_jsonb(template::text)
+WHERE info_jsonb IS NULL OR template_jsonb IS NULL;
+
+ALTER TABLE main_news DROP COLUMN info;
+ALTER TABLE main_news DROP COLUMN template;
+ALTER TABLE main_news RENAME COLUMN info_jsonb TO info;
+ALTER TABLE main_news RENAME COLUMN template_jsonb TO template;
+
+UPDATE main_news SET info = '{}'::jsonb WHERE info IS NULL;
+UPDATE main_news SET template = '[]'::jsonb WHERE template IS NULL;
+ALTER TABLE main_news ALTER COLUMN info SET NOT NULL;
+ALTER TABLE main_news ALTER COLUMN template SET NOT NULL;
+
+DROP FUNCTION IF EXISTS main_news_to_jsonb(text);
+"""
+
+REVERSE_SQL = """
+ALTER TABLE main_news ALTER COLUMN info TYPE text USING info::text;
+ALTER TABLE main_news ALTER COLUMN template TYPE text USING template::text;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_news_jsonb_columns'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='news',
+                    name='info',
+                    field=models.JSONField(default=dict),
+                ),
+                migrations.AlterField(
+                    model_name='news',
+                    name='template',
+                    field=models.JSONField(default=list),
+                ),
+            ],
+        ),
+    ]
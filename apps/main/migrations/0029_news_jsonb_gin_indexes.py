@@ -0,0 +1,24 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('main', '0028_news_jsonb_swap'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['info'], name='main_news_info_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['template'], name='main_news_template_gin', opclasses=['jsonb_path_ops']
+            ),
+        ),
+    ]
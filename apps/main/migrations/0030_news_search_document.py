@@ -0,0 +1,82 @@
+# Documento de búsqueda (tsvector) de las novedades, mantenido por triggers.
+#
+# main_news_build_search_document arma el documento a partir del número, el
+# empleado, la descripción del tipo de novedad (core_typenews vive en public y se
+# resuelve por el search_path), el código/nombre de la ubicación y los valores de
+# info. Los cambios en la ubicación se propagan con un trigger sobre main_location;
+# los cambios en TypeNews los propaga la tarea rebuild_news_search_document.
+#
+# Las filas existentes no se actualizan aquí para no bloquear main_news: se
+# completan en lotes con `manage.py rebuild_news_search` y la 0031 crea el
+# índice GIN con CREATE INDEX CONCURRENTLY.
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE OR REPLACE FUNCTION main_news_build_search_document(
+    p_info jsonb, p_number integer, p_employee varchar, p_type_news_id uuid, p_location_id uuid
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('simple', coalesce(p_number::text, '') || ' ' || coalesce(p_employee, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT description FROM core_typenews WHERE id = p_type_news_id), ''
+        )), 'B') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT code || ' ' || name FROM main_location WHERE id = p_location_id), ''
+        )), 'B') ||
+        setweight(jsonb_to_tsvector('simple', coalesce(p_info, '{}'::jsonb), '["string", "numeric"]'), 'C')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION main_news_search_document_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_document := main_news_build_search_document(
+        NEW.info, NEW.number, NEW.employee, NEW.type_news_id, NEW.location_id
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_news_search_document
+    BEFORE INSERT OR UPDATE OF info, number, employee, type_news_id, location_id ON main_news
+    FOR EACH ROW EXECUTE PROCEDURE main_news_search_document_trigger();
+
+CREATE OR REPLACE FUNCTION main_location_search_document_trigger() RETURNS trigger AS $$
+BEGIN
+    IF NEW.code IS DISTINCT FROM OLD.code OR NEW.name IS DISTINCT FROM OLD.name THEN
+        UPDATE main_news
+        SET search_document = main_news_build_search_document(info, number, employee, type_news_id, location_id)
+        WHERE location_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_location_search_document
+    AFTER UPDATE OF code, name ON main_location
+    FOR EACH ROW EXECUTE PROCEDURE main_location_search_document_trigger();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS main_location_search_document ON main_location;
+DROP FUNCTION IF EXISTS main_location_search_document_trigger();
+DROP TRIGGER IF EXISTS main_news_search_document ON main_news;
+DROP FUNCTION IF EXISTS main_news_search_document_trigger();
+DROP FUNCTION IF EXISTS main_news_build_search_document(jsonb, integer, varchar, uuid, uuid);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_news_jsonb_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,24 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0031_news_search_gin_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='has_attachments',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='person_type_ids',
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255), blank=True, default=list, editable=False, size=None
+            ),
+        ),
+    ]
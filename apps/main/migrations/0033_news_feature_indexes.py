@@ -0,0 +1,23 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('main', '0032_news_feature_columns'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['person_type_ids'], name='main_news_person_types_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='news',
+            index=models.Index(condition=models.Q(has_attachments=True), fields=['-number'],
+                               name='main_news_attach_number_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Secuencia nativa (por schema) para News.number. Reemplaza el contador 'order'
+# de django-sequences, cuya fila quedaba bloqueada hasta el commit de cada novedad.
+# Se inicializa con el mayor valor entre max(number) y el último valor de 'order'.
+
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE SEQUENCE IF NOT EXISTS main_news_number_seq AS integer MINVALUE 1;
+ALTER SEQUENCE main_news_number_seq OWNED BY main_news.number;
+
+DO $$
+DECLARE
+    last_value integer;
+BEGIN
+    SELECT coalesce(max(number), 0) INTO last_value FROM main_news;
+    IF to_regclass('sequences_sequence') IS NOT NULL THEN
+        SELECT greatest(last_value, coalesce(max(last), 0)) INTO last_value
+        FROM sequences_sequence WHERE name = 'order';
+    END IF;
+    IF last_value > 0 THEN
+        PERFORM setval('main_news_number_seq', last_value, true);
+    END IF;
+END
+$$;
+
+ALTER TABLE main_news ALTER COLUMN number SET DEFAULT nextval('main_news_number_seq');
+"""
+
+REVERSE_SQL = """
+ALTER TABLE main_news ALTER COLUMN number DROP DEFAULT;
+
+DO $$
+BEGIN
+    IF to_regclass('sequences_sequence') IS NOT NULL THEN
+        INSERT INTO sequences_sequence (name, last)
+        SELECT 'order', last_value FROM main_news_number_seq WHERE is_called
+        ON CONFLICT (name) DO UPDATE SET last = greatest(sequences_sequence.last, EXCLUDED.last);
+    END IF;
+END
+$$;
+
+DROP SEQUENCE IF EXISTS main_news_number_seq;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0033_news_feature_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
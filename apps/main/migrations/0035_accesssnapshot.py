@@ -0,0 +1,29 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0034_news_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccessSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('version', models.PositiveIntegerField(unique=True, verbose_name='version')),
+                ('valid_from', models.DateField(verbose_name='valid from')),
+                ('days', models.PositiveSmallIntegerField(verbose_name='days')),
+                ('persons', models.JSONField(default=dict, help_text='Personas por documento de identidad')),
+                ('digest', models.CharField(help_text='sha256 del contenido, evita versiones sin cambios', max_length=64)),
+            ],
+            options={
+                'ordering': ['-version'],
+            },
+        ),
+    ]
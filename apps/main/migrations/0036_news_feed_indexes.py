@@ -0,0 +1,21 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('main', '0035_accesssnapshot'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='news',
+            index=models.Index(fields=['created', 'id'], name='main_news_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='news',
+            index=models.Index(fields=['updated'], name='main_news_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Los filtros de adjuntos y tipos de persona usan has_attachments y
+# person_type_ids (0032, 0033): los índices GIN de info y template ya no tienen
+# consultas y solo encarecen cada escritura de main_news.
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('main', '0036_news_feed_indexes'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(model_name='news', name='main_news_info_gin'),
+        RemoveIndexConcurrently(model_name='news', name='main_news_template_gin'),
+    ]
@@ -1,14 +1,19 @@
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.mail import EmailMultiAlternatives
-from django.db import models
+from django.db import connection, models, transaction
 from datetime import datetime
 import json
-import jsonfield
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django.utils.functional import cached_property
 
-from apps.core.models import ModelBase
+from apps.core.cache import bump_version
+from apps.core.models import ModelBase, TypeNews
+from apps.core.sequences import get_next_values
 from sequences import get_next_value
 from apps.setting.tasks import send_email
 
@@ -17,6 +22,10 @@ def get_auto_code_material():
     return get_next_value('code_material', initial_value=1000000)
 
 
+def get_auto_codes_material(count):
+    return [str(code) for code in get_next_values('code_material', count, initial_value=1000000)]
+
+
 class Material(ModelBase):
     code = models.CharField(max_length=255, verbose_name="code", unique=True, help_text="Código del material")
     serial = models.CharField(
@@ -95,6 +104,10 @@ def get_auto_code_person():
     return get_next_value('code_person', initial_value=100000)
 
 
+def get_auto_codes_person(count):
+    return [str(code) for code in get_next_values('code_person', count, initial_value=100000)]
+
+
 class Person(ModelBase):
 
     MALE = "M"
@@ -139,7 +152,11 @@ class PersonNews(ModelBase):
 
 
 def get_new_number():
-    return get_next_value('order')
+    # nextval no participa de la transacción: no bloquea a otras novedades
+    # concurrentes (ver migración 0033)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval('main_news_number_seq')")
+        return cursor.fetchone()[0]
 
 
 class News(ModelBase):
@@ -148,8 +165,8 @@ class News(ModelBase):
     )
     type_news = models.ForeignKey('core.TypeNews', verbose_name=_('type_news'), on_delete=models.PROTECT,
                                   help_text="Tipo de la novedad", blank=True)
-    template = jsonfield.JSONField(default=list)
-    info = jsonfield.JSONField(default=dict)
+    template = models.JSONField(default=list)
+    info = models.JSONField(default=dict)
     created_by = models.ForeignKey('security.User', verbose_name=_('created_by'), on_delete=models.PROTECT,
                                    help_text="Usuario por el que fue crada la novedad", null=True)
     materials = models.ManyToManyField(Material, verbose_name=_('materials'), related_name='news', through=MaterialNews)
@@ -159,51 +176,75 @@ class News(ModelBase):
                                 help_text="Ficha del trabajador que generó la novedad")
     location = models.ForeignKey('Location', verbose_name=_('location'), on_delete=models.PROTECT,
                                  help_text="Ubicación o Libro donde se generó la novedad", null=True)
+    # Mantenido por el trigger main_news_search_document (ver migración 0030)
+    search_document = SearchVectorField(null=True, editable=False)
 
-    @cached_property
-    def contains_attached_files(self):
-        try:
-            if not self.info:  # Si info está vacío
-                return False
-
-            info_data = self.info if isinstance(self.info, dict) else json.loads(self.info)
-            for key, value in info_data.items():
-                if key.startswith('ATTACHED_FILE_'):
-                    attached_files = value.get('attachedFiles')
-                    # Verifica si attachedFiles tiene contenido
-                    if attached_files and ((isinstance(attached_files, (list, dict)) and attached_files) or
-                                           (isinstance(attached_files, str) and attached_files.strip())):
-                            return True
-            return False
-        except (json.JSONDecodeError, AttributeError):
-            return False
-
-    @cached_property
-    def person_types(self):
-        """
-        Retorna una lista de los tipos de persona presentes en la novedad
-        Versión cacheada para mejor rendimiento
-        """
-        if not self.info:
-            return []
+    # Datos derivados de info, calculados en save() para poder filtrarlos por índice
+    has_attachments = models.BooleanField(default=False, editable=False)
+    person_type_ids = ArrayField(models.CharField(max_length=255), default=list, blank=True, editable=False)
 
-        # Asume que info puede ser ya un dict (depende de tu JSONField)
-        info_data = self.info if isinstance(self.info, dict) else json.loads(self.info)
+    FEATURE_FIELDS = ('has_attachments', 'person_type_ids')
 
-        type_persons = []
-        person_keys = [key for key in info_data.keys()
-                       if key.startswith('PERSON_') and isinstance(info_data[key], dict)]
+    @property
+    def contains_attached_files(self):
+        return self.has_attachments
 
-        for key in person_keys:
-            person_info = info_data[key]
-            if person_info.get('type_person'):
-                type_persons.append(str(person_info['type_person']))  # Asegurar string para consistencia
+    @property
+    def person_types(self):
+        """ Retorna una lista de los tipos de persona presentes en la novedad """
+        return list(self.person_type_ids or [])
 
-        return list(set(type_persons))
+    def _info_data(self):
+        if not self.info:
+            return {}
+        try:
+            info_data = self.info if isinstance(self.info, dict) else json.loads(self.info)
+        except json.JSONDecodeError:
+            return {}
+        return info_data if isinstance(info_data, dict) else {}
+
+    def compute_has_attachments(self):
+        for key, value in self._info_data().items():
+            if key.startswith('ATTACHED_FILE_') and isinstance(value, dict):
+                attached_files = value.get('attachedFiles')
+                # Verifica si attachedFiles tiene contenido
+                if isinstance(attached_files, (list, dict)) and attached_files:
+                    return True
+                if isinstance(attached_files, str) and attached_files.strip():
+                    return True
+        return False
+
+    def compute_person_type_ids(self):
+        type_persons = set()
+        for key, value in self._info_data().items():
+            if key.startswith('PERSON_') and isinstance(value, dict) and value.get('type_person'):
+                type_persons.add(str(value['type_person']))  # Asegurar string para consistencia
+        return sorted(type_persons)
+
+    def refresh_features(self):
+        self.has_attachments = self.compute_has_attachments()
+        self.person_type_ids = self.compute_person_type_ids()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'info' in update_fields:
+            self.refresh_features()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields).union(self.FEATURE_FIELDS)
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = _('new')
         verbose_name_plural = _('news')
+        indexes = [
+            GinIndex(fields=['search_document'], name='main_news_search_gin'),
+            GinIndex(fields=['person_type_ids'], name='main_news_person_types_gin'),
+            models.Index(fields=['-number'], name='main_news_attach_number_idx',
+                         condition=models.Q(has_attachments=True)),
+            # Feed incremental de NoveltiesAPI: keyset por (created, id) y filtro updated_since
+            models.Index(fields=['created', 'id'], name='main_news_created_id_idx'),
+            models.Index(fields=['updated'], name='main_news_updated_idx'),
+        ]
 
 
 class Location(ModelBase):
@@ -257,4 +298,91 @@ class AccessEntry(ModelBase):
                               help_text="Comprobante del acceso")
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class AccessSnapshot(ModelBase):
+    """
+    Lista de acceso versionada para verificar sin conexión en los dispositivos
+    de las garitas: personas activas, fuera de la lista negra y con tipo que
+    requiere verificación, con sus ventanas de acceso de los próximos días.
+    """
+    version = models.PositiveIntegerField(unique=True, verbose_name=_('version'))
+    valid_from = models.DateField(verbose_name=_('valid from'))
+    days = models.PositiveSmallIntegerField(verbose_name=_('days'))
+    persons = models.JSONField(default=dict, help_text="Personas por documento de identidad")
+    digest = models.CharField(max_length=64, help_text="sha256 del contenido, evita versiones sin cambios")
+
+    class Meta:
+        ordering = ['-version']
+
+
+@receiver(post_save, sender=AccessEntry)
+@receiver(post_delete, sender=AccessEntry)
+@receiver(post_save, sender=AccessGroup)
+@receiver(post_delete, sender=AccessGroup)
+@receiver(m2m_changed, sender=AccessEntry.persons.through)
+@receiver(m2m_changed, sender=AccessGroup.persons.through)
+def invalidate_access_rules(sender, **kwargs):
+    from apps.main.access import RULES_VERSION
+
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_version(RULES_VERSION)
+
+
+@receiver(post_save, sender=TypePerson)
+@receiver(post_delete, sender=TypePerson)
+@receiver(post_save, sender=TypeNews)
+@receiver(post_delete, sender=TypeNews)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def invalidate_catalogs(sender, **kwargs):
+    from apps.main.catalogs import CATALOGS
+
+    catalog = CATALOGS[sender]
+    bump_version(catalog.version_name, catalog.schema_name())
+
+
+WARM_BATCH_SIZE = 1000
+
+
+class NewsFormatWarmer:
+    """
+    Novedades guardadas en la transacción actual; al confirmarla encola las
+    tareas de warm_novelty_formats en bloques, en vez de una por save().
+    """
+
+    def __init__(self, schema_name):
+        self.schema_name = schema_name
+        self.news_ids = []
+
+    def __call__(self):
+        from apps.api.tasks import warm_novelty_formats
+
+        for start in range(0, len(self.news_ids), WARM_BATCH_SIZE):
+            warm_novelty_formats.delay(self.schema_name, self.news_ids[start:start + WARM_BATCH_SIZE])
+
+    @classmethod
+    def current(cls):
+        """ El warmer pendiente de la transacción en curso, o uno nuevo registrado con on_commit """
+        warmer = getattr(connection, 'news_format_warmer', None)
+        # Si la transacción se confirmó o se revirtió, el warmer ya no está en run_on_commit
+        if (warmer is None or warmer.schema_name != connection.schema_name
+                or not any(func is warmer for _, func in connection.run_on_commit)):
+            warmer = connection.news_format_warmer = cls(connection.schema_name)
+            if connection.in_atomic_block:
+                transaction.on_commit(warmer)
+        return warmer
+
+
+@receiver(post_save, sender=News)
+def warm_news_format(sender, instance, raw=False, **kwargs):
+    # El formato de NoveltyByTypeAPI se calcula al confirmar la transacción, fuera de la petición
+    if raw:
+        return
+    warmer = NewsFormatWarmer.current()
+    warmer.news_ids.append(str(instance.pk))
+    if not connection.in_atomic_block:
+        warmer()
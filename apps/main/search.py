@@ -0,0 +1,56 @@
+import uuid
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+# Debe coincidir con la configuración usada por main_news_build_search_document
+SEARCH_CONFIG = 'simple'
+
+REBUILD_BATCH_SQL = """
+WITH batch AS (
+    SELECT id FROM main_news
+    WHERE id > %s {condition}
+    ORDER BY id
+    LIMIT %s
+)
+UPDATE main_news AS news
+SET search_document = main_news_build_search_document(
+    news.info, news.number, news.employee, news.type_news_id, news.location_id
+)
+FROM batch
+WHERE news.id = batch.id
+RETURNING news.id
+"""
+
+
+def search_news(queryset, text):
+    """ Filtra y ordena por relevancia las novedades que coinciden con la búsqueda """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(search_document=query).annotate(
+        rank=SearchRank(F('search_document'), query)
+    ).order_by('-rank', '-number')
+
+
+def rebuild_search_documents(type_news_id=None, batch_size=1000):
+    """
+    Recalcula el documento de búsqueda de las novedades del schema activo,
+    opcionalmente solo las de un tipo de novedad. Retorna la cantidad de filas.
+    """
+    condition = ''
+    extra_params = []
+    if type_news_id is not None:
+        condition = 'AND type_news_id = %s'
+        extra_params = [type_news_id]
+    sql = REBUILD_BATCH_SQL.format(condition=condition)
+
+    total = 0
+    last_id = uuid.UUID(int=0)
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [last_id] + extra_params + [batch_size])
+            ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return total
+        total += len(ids)
+        last_id = max(ids)
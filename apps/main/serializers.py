@@ -1,5 +1,5 @@
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django_restql.mixins import DynamicFieldsMixin
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -7,11 +7,11 @@ from rest_framework.exceptions import ValidationError
 from apps.core.serializers import TypeNewsDefaultSerializer
 from apps.customers.serializers import ClientSimpleSerializer
 from apps.main.models import AccessEntry, TypePerson, Person, Vehicle, Material, News, Schedule, Location, Point, EquipmentTools, \
-    get_auto_code_material, get_auto_code_person, AccessGroup
+    get_auto_code_material, get_auto_code_person, get_auto_codes_material, get_auto_codes_person, AccessGroup
 from apps.security.models import User
 from apps.setting.models import Notification
 from apps.setting.tasks import generate_notification_async, send_email
-from apps.api.views import get_person_types_map
+from apps.main.catalogs import get_person_types_map
 
 
 class TypePersonDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
@@ -20,6 +20,46 @@ class TypePersonDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerialize
         fields = serializers.ALL_FIELDS
 
 
+class BulkCodeListSerializer(serializers.ListSerializer):
+    """
+    Crea la lista con un solo bulk_create. Los códigos faltantes se reservan en
+    bloque (una sentencia) con `allocate` en lugar de uno por registro. Cada
+    subclase debe definir allocate(count) -> lista de códigos.
+    """
+    code_fields = ('code',)
+    allocate = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(cls.allocate):
+            raise TypeError("{0} debe definir allocate".format(cls.__name__))
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        missing = [
+            data for data in validated_data
+            if any(data.get(field) in (None, "") for field in self.code_fields)
+        ]
+        try:
+            with transaction.atomic():
+                for data, code in zip(missing, self.allocate(len(missing))):
+                    for field in self.code_fields:
+                        if data.get(field) in (None, ""):
+                            data[field] = code
+                return model.objects.bulk_create([model(**data) for data in validated_data])
+        except IntegrityError as error:
+            raise serializers.ValidationError(detail={"error": str(error)})
+
+
+class PersonListSerializer(BulkCodeListSerializer):
+    allocate = staticmethod(get_auto_codes_person)
+
+
+class MaterialListSerializer(BulkCodeListSerializer):
+    code_fields = ('code', 'serial')
+    allocate = staticmethod(get_auto_codes_material)
+
+
 class PersonDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     code = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     type_person_display = TypePersonDefaultSerializer(read_only=True, source="type_person")
@@ -46,6 +86,7 @@ class PersonDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Person
         fields = serializers.ALL_FIELDS
+        list_serializer_class = PersonListSerializer
 
 
 class VehicleDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
@@ -80,6 +121,7 @@ class MaterialDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer)
     class Meta:
         model = Material
         fields = serializers.ALL_FIELDS
+        list_serializer_class = MaterialListSerializer
 
 
 class MaterialScopeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
@@ -134,30 +176,39 @@ class NewsDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     location_display = LocationDefaultSerializer(read_only=True, source="location")
     client_display = serializers.SerializerMethodField(read_only=True)
     link = serializers.SerializerMethodField(read_only=True)
-    contains_attached_files = serializers.SerializerMethodField()
-    person_types = serializers.SerializerMethodField()
+    contains_attached_files = serializers.BooleanField(source='has_attachments', read_only=True)
+    person_types = serializers.ListField(source='person_type_ids', child=serializers.CharField(), read_only=True)
     person_types_details = serializers.SerializerMethodField()
 
-    def get_contains_attached_files(self, obj):
-        # Accede una vez para que se cachee
-        return obj.contains_attached_files
-
-    def get_person_types(self, obj):
-        """Retorna la lista de IDs de tipos de persona"""
-        return obj.person_types
+    def get_request_constant(self, key, factory):
+        """
+        Calcula una sola vez por petición los valores que no dependen de la fila.
+        El contexto es compartido por todas las filas de un listado.
+        """
+        constants = self.context.setdefault('news_constants', {})
+        if key not in constants:
+            constants[key] = factory()
+        return constants[key]
 
     def get_person_types_details(self, obj):
         """Retorna detalles completos de los tipos de persona usando tu mapa cacheado"""
-        type_map = get_person_types_map()
-        return [type_map.get(t_id, {}) for t_id in obj.person_types if t_id in type_map]
+        type_map = self.get_request_constant('person_types_map', get_person_types_map)
+        return [type_map.get(t_id, {}) for t_id in obj.person_type_ids if t_id in type_map]
 
     def get_link(self, obj):
-        request = self.context.get('request')
-        return settings.HOST_LINKS + "/#/viewlink/" + str(obj.id) + "/" + request.tenant.schema_name
+        def link_parts():
+            request = self.context.get('request')
+            return settings.HOST_LINKS + "/#/viewlink/", "/" + request.tenant.schema_name
+
+        prefix, suffix = self.get_request_constant('link_parts', link_parts)
+        return prefix + str(obj.id) + suffix
 
     def get_client_display(self, obj):
-        request = self.context.get('request')
-        return ClientSimpleSerializer(request.tenant).data
+        def client_display():
+            request = self.context.get('request')
+            return ClientSimpleSerializer(request.tenant).data
+
+        return self.get_request_constant('client_display', client_display)
 
     def create(self, validated_data):
         request = self.context.get('request')
@@ -233,7 +284,7 @@ class NewsDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = News
-        fields = serializers.ALL_FIELDS
+        exclude = ('search_document', 'has_attachments', 'person_type_ids')
 
 
 class ScheduleDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
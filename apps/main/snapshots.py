@@ -0,0 +1,114 @@
+import hashlib
+import json
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from sequences import get_next_value
+
+from apps.main.access import get_persons_rules
+from apps.main.models import AccessSnapshot, Person
+
+SNAPSHOT_DAYS = getattr(settings, 'ACCESS_SNAPSHOT_DAYS', 7)
+
+# Versiones anteriores que se conservan para responder deltas
+SNAPSHOT_KEEP = getattr(settings, 'ACCESS_SNAPSHOT_KEEP', 48)
+
+DELTA_CACHE_TIMEOUT = 60 * 60
+
+CHUNK_SIZE = 1000
+
+
+def snapshot_persons(first_day, days):
+    """ {doc_ident: persona compacta con sus ventanas} de las personas que se verifican en garita """
+    last_day = first_day + timedelta(days=days - 1)
+    queryset = Person.objects.filter(
+        is_active=True, blacklist=False, type_person__requires_access_verification=True
+    ).order_by('doc_ident').values_list('id', 'doc_ident', 'code', 'name', 'last_name', 'type_person_id')
+
+    persons = {}
+    rows = list(queryset)
+    for offset in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[offset:offset + CHUNK_SIZE]
+        rules = get_persons_rules([row[0] for row in chunk])
+        for person_id, doc_ident, code, name, last_name, type_person_id in chunk:
+            windows = sorted(
+                (day.isoformat(), start.strftime('%H:%M:%S'), end.strftime('%H:%M:%S'))
+                for rule in rules[person_id] for day, start, end in rule.windows(first_day, last_day)
+            )
+            persons[doc_ident] = {
+                'id': str(person_id),
+                'code': code,
+                'full_name': '{0} {1}'.format(name, last_name),
+                'type_person': str(type_person_id),
+                'windows': [list(window) for window in windows],
+            }
+    return persons
+
+
+def build_snapshot(days=None, today=None):
+    """ Crea una versión nueva si el contenido cambió respecto a la última; devuelve la vigente """
+    days = days or SNAPSHOT_DAYS
+    today = today or date.today()
+    persons = snapshot_persons(today, days)
+    digest = hashlib.sha256(json.dumps(persons, sort_keys=True).encode('utf-8')).hexdigest()
+
+    latest = AccessSnapshot.objects.first()
+    if latest is not None and latest.digest == digest and latest.valid_from == today and latest.days == days:
+        return latest
+
+    snapshot = AccessSnapshot.objects.create(
+        version=get_next_value('access_snapshot'),
+        valid_from=today,
+        days=days,
+        persons=persons,
+        digest=digest,
+    )
+    stale = AccessSnapshot.objects.values_list('id', flat=True)[SNAPSHOT_KEEP:]
+    AccessSnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+def get_latest_snapshot():
+    return AccessSnapshot.objects.first() or build_snapshot()
+
+
+def snapshot_delta(snapshot, since):
+    """
+    Cambios entre la versión since y snapshot: personas nuevas o modificadas y
+    documentos eliminados. Si since ya no se conserva se devuelve completa.
+    """
+    key = 'access-snapshot:delta:{0}:{1}:{2}'.format(connection.schema_name, since, snapshot.version)
+    delta = cache.get(key)
+    if delta is not None:
+        return delta
+
+    base = AccessSnapshot.objects.filter(version=since).values_list('persons', flat=True).first()
+    if base is None:
+        return snapshot_payload(snapshot)
+    delta = {
+        'version': snapshot.version,
+        'since': since,
+        'full': False,
+        'valid_from': snapshot.valid_from,
+        'days': snapshot.days,
+        'persons': {
+            doc_ident: person for doc_ident, person in snapshot.persons.items() if base.get(doc_ident) != person
+        },
+        'removed': [doc_ident for doc_ident in base if doc_ident not in snapshot.persons],
+    }
+    cache.set(key, delta, timeout=DELTA_CACHE_TIMEOUT)
+    return delta
+
+
+def snapshot_payload(snapshot):
+    return {
+        'version': snapshot.version,
+        'since': None,
+        'full': True,
+        'valid_from': snapshot.valid_from,
+        'days': snapshot.days,
+        'persons': snapshot.persons,
+        'removed': [],
+    }
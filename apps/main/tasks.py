@@ -1 +1,21 @@
 from django.conf import settings
+
+from newsbookbackend.celery import app
+
+
+@app.task
+def rebuild_news_search_document(type_news_id=None):
+    from apps.customers.utils import iter_tenants
+    from apps.main.search import rebuild_search_documents
+
+    for _ in iter_tenants():
+        rebuild_search_documents(type_news_id)
+
+
+@app.task
+def build_access_snapshots(schema_name=None):
+    from apps.customers.utils import iter_tenants
+    from apps.main.snapshots import build_snapshot
+
+    for _ in iter_tenants(schema_name):
+        build_snapshot()
@@ -1,3 +1,48 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.core.models import TypeNews
+from apps.main.models import Location, Material, MaterialNews, News, Person, PersonNews, TypePerson
+from apps.main.views import NewsViewSet
+
+
+class NewsListQueriesTest(TenantTestCase):
+    """ Las consultas del listado de novedades no dependen del tamaño de la página """
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'test'
+        tenant.paid_until = date(2100, 1, 1)
+        tenant.on_trial = False
+
+    def setUp(self):
+        super().setUp()
+        type_news = TypeNews.objects.create(code='test', description='Novedad de prueba', info='')
+        location = Location.objects.create(code='L1', name='Libro de prueba')
+        material = Material.objects.create(code='M1', description='Material de prueba')
+        type_person = TypePerson.objects.create(description='Visitante', priority='1')
+        person = Person.objects.create(code='P1', name='Ana', last_name='Pérez', doc_ident='V1',
+                                       type_person=type_person)
+        news = News.objects.bulk_create([
+            News(type_news=type_news, location=location, employee=str(index)) for index in range(600)
+        ])
+        MaterialNews.objects.bulk_create([MaterialNews(material=material, news=item) for item in news])
+        PersonNews.objects.bulk_create([PersonNews(persons=person, news=item) for item in news])
+        self.view = NewsViewSet.as_view({'get': 'list'})
+
+    def list_news(self, limit):
+        request = APIRequestFactory().get('/api/main/news/', {'limit': limit})
+        request.tenant = self.tenant
+        response = self.view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+
+    def test_query_count_is_constant_in_page_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.list_news(10)
+        with self.assertNumQueries(len(queries)):
+            self.list_news(500)
@@ -1,8 +1,8 @@
-import tablib
 from django.db import connections
 from django.db.models import CharField, Q, Func, Value, TextField
 from django.db.models.functions import Cast
 from django_filters.rest_framework import DjangoFilterBackend
+from django_restql.mixins import EagerLoadingMixin
 from django_tenants.utils import get_tenant_database_alias
 from rest_framework import status, mixins
 from rest_framework.decorators import action
@@ -10,23 +10,27 @@ from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
-from tablib import Dataset
 from django_filters import rest_framework as filters
 
 from django.db.models.fields import BooleanField
 from django.db.models.expressions import ExpressionWrapper
-from datetime import datetime, timedelta, timezone
 
-from apps.setting.models import FacialRecognitionEvent
 # Create your views here.
+from apps.core.bulk import BulkCreateMixin
+from apps.core.pagination import CursorPaginationMixin, NewsCursorPagination, PersonCursorPagination
+from apps.core.exports import ExportMixin
+from apps.core.streaming import StreamingListMixin
 from apps.customers.models import Client
+from apps.main.access import GATE_CHECK_MAX_SIZE, gate_check
 from apps.main.admin import VehicleResource, NewsResource, MaterialResource, TypePersonResource, PersonResource, \
     ScheduleResource, LocationResource, PointResource
 from apps.main.models import AccessEntry, Vehicle, TypePerson, Person, Material, News, Schedule, Location, Point, EquipmentTools, AccessGroup
+from apps.main.search import search_news
+from apps.main.snapshots import get_latest_snapshot, snapshot_delta, snapshot_payload
 from apps.main.serializers import AccessEntrySerializer, VehicleDefaultSerializer, TypePersonDefaultSerializer, PersonDefaultSerializer, \
     MaterialDefaultSerializer, NewsDefaultSerializer, ScheduleDefaultSerializer, LocationDefaultSerializer, \
     PointDefaultSerializer, EquipmentToolsDefaultSerializer, AccessGroupSerializer
-from apps.setting.serializers import FacialRecognitionEventSerializer
+from apps.setting.imports import ImportMixin
 
 
 class TypePersonFilter(filters.FilterSet):
@@ -34,9 +38,10 @@ class TypePersonFilter(filters.FilterSet):
         model = TypePerson
         fields = ['priority', 'is_institution', 'requires_company_data', 'requires_guide_number', 'requires_access_verification']
 
-class TypePersonViewSet(ModelViewSet):
+class TypePersonViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = TypePerson.objects.all()
     serializer_class = TypePersonDefaultSerializer
+    export_resource_class = TypePersonResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['description']
     permission_classes = (AllowAny,)
@@ -44,6 +49,8 @@ class TypePersonViewSet(ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -62,67 +69,6 @@ class TypePersonViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = TypePersonResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = TypePersonResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
 
 class PersonFilter(filters.FilterSet):
     requires_access_verification = filters.BooleanFilter(method='filter_requires_access_verification')
@@ -136,9 +82,11 @@ class PersonFilter(filters.FilterSet):
             return queryset.filter(type_person__requires_access_verification=True)
         return queryset
 
-class PersonViewSet(ModelViewSet):
+class PersonViewSet(BulkCreateMixin, ImportMixin, ExportMixin, StreamingListMixin, CursorPaginationMixin, ModelViewSet):
     queryset = Person.objects.all()
     serializer_class = PersonDefaultSerializer
+    export_resource_class = PersonResource
+    cursor_pagination_class = PersonCursorPagination
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = PersonFilter
     search_fields = ['code', 'name', 'last_name', 'doc_ident', 'blacklist_reason']
@@ -156,198 +104,42 @@ class PersonViewSet(ModelViewSet):
     @action(methods=['GET'], detail=False, url_path='get-person')
     def get_person_by_identification(self, request):
         identification = request.query_params.get('identification', None)
-        data = None
-
+        result = gate_check([identification], self.request.tenant.facial_recognition)[0]
+        result.pop('identification')
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=False, url_path='gate-check')
+    def gate_check(self, request):
+        """ Verificación de acceso por lote: {"identifications": ["V123", ...]} """
+        identifications = request.data.get('identifications', None)
+        if not isinstance(identifications, list) or not identifications:
+            return Response({"error": "Debe indicar la lista de identificaciones"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(identifications) > GATE_CHECK_MAX_SIZE:
+            return Response({"error": "Máximo {0} identificaciones por solicitud".format(GATE_CHECK_MAX_SIZE)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        identifications = list(dict.fromkeys(str(identification) for identification in identifications))
+        return Response(gate_check(identifications, self.request.tenant.facial_recognition),
+                        status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='access-snapshot')
+    def access_snapshot(self, request):
+        """ Lista de acceso para dispositivos sin conexión; ?since=<versión> devuelve solo los cambios """
+        snapshot = get_latest_snapshot()
+        since = request.query_params.get('since', None)
+        if since is None:
+            return Response(snapshot_payload(snapshot), status=status.HTTP_200_OK)
         try:
-            person = Person.objects.get(doc_ident=identification)
-            data = PersonDefaultSerializer(person).data
-        except Person.DoesNotExist:
-            person = None
-        time_threshold = datetime.now() - timedelta(minutes=5)
-
-        if self.request.tenant.facial_recognition:
-            try:
-                # Verificar si hay eventos de reconocimiento facial recientes (últimos 5 minutos)
-                has_recent_facial_event = FacialRecognitionEvent.objects.filter(
-                    user_id=identification,
-                    event_time__gte=time_threshold
-                ).exists()
-
-                if not has_recent_facial_event:
-                    return Response({
-                        "person": data,
-                        "blacklist": False,
-                        "has_access": False,
-                        "message": "No se ha detectado un reconocimiento facial reciente"
-                    }, status=status.HTTP_200_OK)
-
-            except FacialRecognitionEvent.DoesNotExist:
-                return Response({
-                    "person": data,
-                    "blacklist": False,
-                    "has_access": False,
-                    "message": "La persona no ha sido registrada para reconocimiento facial"
-                }, status=status.HTTP_200_OK)
-
-        if not person:
-            return Response({
-                "person": None,
-                "blacklist": False,
-                "recognition_event_data": FacialRecognitionEventSerializer(FacialRecognitionEvent.objects.filter(
-                    user_id=identification,
-                    event_time__gte=time_threshold
-                ).last()).data,
-                "has_access": self.request.tenant.facial_recognition,
-                "message": "La persona no existe"
-            }, status=status.HTTP_200_OK)
-
-        # Verificar blacklist
-        blacklist = person.blacklist
-
-        if blacklist:
-            return Response({
-                "person": data,
-                "blacklist": True,
-                "has_access": False,
-                "message": "Persona bloqueada"
-            }, status=status.HTTP_200_OK)
-
-        if person.type_person.requires_access_verification:
-            # Buscar accesos registrados
-            all_accesses = AccessEntry.objects.filter(Q(persons=person) | Q(group__persons=person))
-            # Chequear si tiene acceso vigente
-            now = datetime.now()
-            has_access = False
-            access_details = None
-            for access in all_accesses:
-                if access.access_type == AccessEntry.SINGLE:
-                    if access.date_start and access.date_end:
-                        if access.date_start <= now.date() <= access.date_end:
-                            if access.start_time <= now.time() <= access.end_time:
-                                has_access = True
-                                access_details = AccessEntrySerializer(access).data
-                                break
-                elif access.access_type == AccessEntry.RECURRING:
-                    if access.week_days and now.strftime('%A') in access.week_days:
-                        if access.date_start <= now.date() <= access.date_end:
-                            if access.start_time <= now.time() <= access.end_time:
-                                has_access = True
-                                access_details = AccessEntrySerializer(access).data
-                                break
-                    if access.specific_days and now.day in access.specific_days:
-                        if access.date_start <= now.date() <= access.date_end:
-                            if access.start_time <= now.time() <= access.end_time:
-                                has_access = True
-                                access_details = AccessEntrySerializer(access).data
-                                break
-            if has_access:
-                return Response({
-                    "person": data,
-                    "blacklist": False,
-                    "has_access": True,
-                    "access_details": access_details,
-                    "message": "Acceso permitido",
-                    "access_list": []
-                }, status=status.HTTP_200_OK)
-            # Buscar el próximo acceso futuro (single o recurrente)
-            future_accesses = []
-            for access in all_accesses:
-                if access.access_type == AccessEntry.SINGLE:
-                    if access.date_start and access.date_end and access.date_end >= now.date():
-                        if access.date_start >= now.date() or (access.date_start <= now.date() <= access.date_end):
-                            future_accesses.append(access)
-                elif access.access_type == AccessEntry.RECURRING:
-                    if access.week_days or access.specific_days:
-                        if access.date_start >= now.date() or (access.date_start <= now.date() <= access.date_end):
-                            future_accesses.append(access)
-
-            future_accesses = sorted(future_accesses, key=lambda a: (
-                a.date_start if a.access_type == AccessEntry.SINGLE else now.date(),
-                a.start_time
-            ))
-            next_access = future_accesses[0] if future_accesses else None
-            access_list = [AccessEntrySerializer(next_access).data] if next_access else []
-            return Response({
-                "person": data,
-                "blacklist": False,
-                "has_access": False,
-                "message": "No tiene acceso permitido en este momento",
-                "access_list": access_list
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                "person": data,
-                "blacklist": False,
-                "has_access": True,
-                "message": "",
-                "access_list": []
-            }, status=status.HTTP_200_OK)
+            since = int(since)
+        except ValueError:
+            return Response({"error": "since debe ser un número de versión"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(snapshot_delta(snapshot, since), status=status.HTTP_200_OK)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = PersonResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
 
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = PersonResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
-
-class VehicleViewSet(ModelViewSet):
+class VehicleViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleDefaultSerializer
+    export_resource_class = VehicleResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['license_plate']
     permission_classes = (AllowAny,)
@@ -361,71 +153,11 @@ class VehicleViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = VehicleResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
 
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = VehicleResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
-
-class MaterialViewSet(ModelViewSet):
+class MaterialViewSet(BulkCreateMixin, ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Material.objects.all()
     serializer_class = MaterialDefaultSerializer
+    export_resource_class = MaterialResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['description', 'code', 'serial']
     permission_classes = (AllowAny,)
@@ -439,73 +171,12 @@ class MaterialViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = MaterialResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = MaterialResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
 
 class NewsFilter(filters.FilterSet):
     number = filters.NumberFilter(lookup_expr='icontains')
     employee = filters.CharFilter(lookup_expr='icontains')
-    template = filters.CharFilter(lookup_expr='icontains')
-    info = filters.CharFilter(lookup_expr='icontains')
+    template = filters.CharFilter(method='filter_json_text')
+    info = filters.CharFilter(method='filter_json_text')
     min_number = filters.NumberFilter(field_name="number", lookup_expr='gte')
     max_number = filters.NumberFilter(field_name="number", lookup_expr='lte')
     min_created = filters.DateFilter(field_name="created", lookup_expr='gte')
@@ -519,33 +190,21 @@ class NewsFilter(filters.FilterSet):
         fields = ['employee', 'number', 'template', 'info', 'location__code', 'location__name', 'min_number',
                   'max_number', 'min_created', 'max_created', 'type_news_id', 'contains_attached_files']
 
-    def filter_contains_attached_files(self, queryset, name, value):
+    def filter_json_text(self, queryset, name, value):
         """
-        Filtro mejorado que verifica archivos adjuntos con contenido válido
+        Búsqueda parcial sobre el texto del JSON (info/template son jsonb)
         """
-        # Convertimos el JSON a texto para buscar patrones
-        queryset = queryset.annotate(
-            info_text=Cast('info', TextField())
-        )
+        if not value:
+            return queryset
+        return queryset.annotate(
+            **{name + '_text': Cast(name, TextField())}
+        ).filter(**{name + '_text__icontains': value})
 
-        # Patrones para buscar
-        if value:
-            return queryset.filter(
-                Q(info_text__contains='"ATTACHED_FILE_') &
-                (
-                    # Para array no vacío: "attachedFiles": [...elementos...]
-                        Q(info_text__contains='"attachedFiles": [') &
-                        ~Q(info_text__contains='"attachedFiles": []') |
-                        # Para string no vacío: "attachedFiles": "valor"
-                        Q(info_text__contains='"attachedFiles": "') &
-                        ~Q(info_text__contains='"attachedFiles": ""')
-                )
-            )
-        else:
-            return queryset.exclude(
-                Q(info_text__contains='"ATTACHED_FILE_') &
-                Q(info_text__contains='"attachedFiles": [')
-            )
+    def filter_contains_attached_files(self, queryset, name, value):
+        """
+        Filtra novedades con (o sin) archivos adjuntos con contenido válido
+        """
+        return queryset.filter(has_attachments=value)
 
     def filter_by_person_type(self, queryset, name, value):
         """
@@ -554,21 +213,24 @@ class NewsFilter(filters.FilterSet):
         """
         if not value:
             return queryset
+        return queryset.filter(person_type_ids__contains=[str(value)])
 
-        # Convertimos el JSON a texto para buscar patrones
-        queryset = queryset.annotate(
-            info_text=Cast('info', TextField())
-        )
-
-        # Buscamos el patrón: "PERSON_" seguido de cualquier cosa y luego "type_person": "valor"
-        return queryset.filter(
-            Q(info_text__contains='"PERSON_') &
-            Q(info_text__contains=f'"type_person": "{value}"')
-        )
 
-class NewsViewSet(ModelViewSet):
-    queryset = News.objects.all().order_by('-number')
+class NewsViewSet(ImportMixin, ExportMixin, StreamingListMixin, CursorPaginationMixin, EagerLoadingMixin, ModelViewSet):
+    queryset = News.objects.defer('search_document').order_by('-number')
     serializer_class = NewsDefaultSerializer
+    export_resource_class = NewsResource
+    cursor_pagination_class = NewsCursorPagination
+    # Relaciones a cargar según los campos pedidos con ?query= (django-restql)
+    select_related = {
+        'type_news_display': 'type_news',
+        'location_display': 'location',
+    }
+    prefetch_related = {
+        'materials': 'materials',
+        'people': 'people',
+        'vehicles': 'vehicles',
+    }
     filter_backends = [DjangoFilterBackend]
     filterset_class = NewsFilter
 
@@ -587,21 +249,9 @@ class NewsViewSet(ModelViewSet):
     def get_queryset(self):
         queryset = super(NewsViewSet, self).get_queryset()
         search = self.request.query_params.get('search', None)
-        if search is None:
+        if not search:
             return queryset
-        else:
-            return queryset.annotate(
-                info_format=Cast('info', output_field=CharField()),
-                template_format=Cast('template', output_field=CharField())
-            ).filter(
-                Q(info_format__contains=search) |
-                Q(number__icontains=search) |
-                Q(template_format__icontains=search) |
-                Q(employee__icontains=search) |
-                Q(type_news__description__icontains=search) |
-                Q(location__code__icontains=search) |
-                Q(location__name__icontains=search)
-            )
+        return search_news(queryset, search)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -610,6 +260,9 @@ class NewsViewSet(ModelViewSet):
                 request.headers['location'] is not None:
             queryset = queryset.filter(location_id=request.headers['location'])
 
+        if self.stream_requested():
+            return self.stream_response(queryset)
+
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True, context=self.get_serializer_context())
@@ -626,67 +279,6 @@ class NewsViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = NewsResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = NewsResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
     @action(methods=['GET'], detail=False)
     def field_options(self, request):
         field = self.request.query_params.get('field', None)
@@ -746,15 +338,18 @@ class NewsLinkViewSet(mixins.RetrieveModelMixin, GenericViewSet):
         return Response(data, status=status.HTTP_200_OK)
 
 
-class ScheduleViewSet(ModelViewSet):
+class ScheduleViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Schedule.objects.all()
     serializer_class = ScheduleDefaultSerializer
+    export_resource_class = ScheduleResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['description']
     permission_classes = (AllowAny,)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -773,77 +368,19 @@ class ScheduleViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = ScheduleResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
 
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = ScheduleResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
-
-class LocationViewSet(ModelViewSet):
+class LocationViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationDefaultSerializer
+    export_resource_class = LocationResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['code', 'name']
     permission_classes = (AllowAny,)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -862,77 +399,19 @@ class LocationViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = LocationResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
 
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = LocationResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
-
-class PointViewSet(ModelViewSet):
+class PointViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Point.objects.all()
     serializer_class = PointDefaultSerializer
+    export_resource_class = PointResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['code', 'name']
     permission_classes = (AllowAny,)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -951,69 +430,8 @@ class PointViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = PointResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
 
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = PointResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(
-                    data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(
-                    data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
-
-class EquipmentToolsViewSet(ModelViewSet):
+class EquipmentToolsViewSet(StreamingListMixin, ModelViewSet):
     queryset = EquipmentTools.objects.all()
     serializer_class = EquipmentToolsDefaultSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -1022,6 +440,8 @@ class EquipmentToolsViewSet(ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -1057,7 +477,7 @@ class AccessGroupFilter(filters.FilterSet):
         fields = ['name', 'description', 'persons', 'persons__name', 'persons__last_name', 'persons__doc_ident']
 
 
-class AccessGroupViewSet(ModelViewSet):
+class AccessGroupViewSet(StreamingListMixin, ModelViewSet):
     queryset = AccessGroup.objects.all()
     serializer_class = AccessGroupSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -1131,7 +551,7 @@ class AccessEntryFilter(filters.FilterSet):
         'min_date', 'max_date', 'persons_global']
 
 
-class AccessEntryViewSet(ModelViewSet):
+class AccessEntryViewSet(StreamingListMixin, ModelViewSet):
     queryset = AccessEntry.objects.all()
     serializer_class = AccessEntrySerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
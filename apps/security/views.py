@@ -1,5 +1,4 @@
 import requests
-import tablib
 import string
 import random
 
@@ -17,8 +16,10 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
-from tablib import Dataset
 from django_filters import rest_framework as filters
+from apps.core.exports import ExportMixin
+from apps.core.streaming import StreamingListMixin
+from apps.setting.imports import ImportMixin
 from .admin import UserResource, RoleResource
 from .models import User
 from .serializers import UserSimpleSerializer, CustomTokenObtainPairSerializer, RoleDefaultSerializer, \
@@ -127,11 +128,12 @@ class UserFilter(filters.FilterSet):
 # Create your views here.
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = User.objects.all()
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = UserFilter
     serializer_class = UserSimpleSerializer
+    export_resource_class = UserResource
     search_fields = ['name', 'last_name', 'email', 'code']
     permission_classes = (AllowAny,)
 
@@ -173,65 +175,6 @@ class UserViewSet(ModelViewSet):
     def current(self, request):
         return Response(UserSimpleSerializer(request.user).data)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = UserResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = UserResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
     @action(methods=['GET'], detail=False)
     def field_options(self, request):
         field = self.request.query_params.get('field', None)
@@ -264,9 +207,10 @@ class UserViewSet(ModelViewSet):
             return Response({"error": "the field parameter is mandatory"}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RoleViewSet(ModelViewSet):
+class RoleViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = RoleDefaultSerializer
+    export_resource_class = RoleResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['name']
     permission_classes = (AllowAny,)
@@ -280,65 +224,6 @@ class RoleViewSet(ModelViewSet):
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = RoleResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = RoleResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
     @action(methods=['GET'], detail=False)
     def field_options(self, request):
         field = self.request.query_params.get('field', None)
@@ -0,0 +1,165 @@
+import json
+import os
+from collections import Counter
+
+import tablib
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from tablib import Dataset
+
+from apps.setting.models import ImportJob, ImportJobError
+
+IMPORT_CHUNK_SIZE = 1000
+PROGRESS_TIMEOUT = 60 * 60 * 24
+
+# Formatos de tablib que se cargan como bytes; el resto se decodifica como texto
+BINARY_FORMATS = ('xls', 'xlsx', 'ods', 'dbf')
+
+
+def progress_cache_key(job_id):
+    return 'import-job:progress:{0}'.format(job_id)
+
+
+def get_progress(job):
+    """ Filas procesadas: la tarea las reporta por cache porque trabaja dentro de una transacción """
+    if job.status != ImportJob.RUNNING:
+        return job.processed_rows
+    return cache.get(progress_cache_key(job.id), job.processed_rows)
+
+
+def to_json(value):
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def file_format(file_name):
+    """ Formato de tablib según la extensión del archivo (csv si no tiene) """
+    return os.path.splitext(file_name)[1].lstrip('.').lower() or 'csv'
+
+
+def load_dataset(file, format_name):
+    # tablib 3 no detecta el formato a partir de bytes: se indica siempre
+    content = file.read()
+    if format_name not in BINARY_FORMATS:
+        content = content.decode('utf-8-sig')
+    return Dataset().load(content, format=format_name)
+
+
+def iter_chunks(dataset, size):
+    for offset in range(0, len(dataset), size):
+        chunk = Dataset(headers=dataset.headers)
+        for row in dataset[offset:offset + size]:
+            chunk.append(row)
+        yield offset, chunk
+
+
+def collect_errors(job, result, headers, offset):
+    """ Convierte los errores de un bloque en ImportJobError con el número de fila del archivo """
+    errors = []
+    for row in result.invalid_rows:
+        errors.append(ImportJobError(
+            job=job,
+            row=offset + row.number,
+            type=ImportJobError.INVALID,
+            errors=['{0}: {1}'.format(field, ', '.join(messages)) for field, messages in row.error_dict.items()],
+            values=to_json(dict(zip(headers, row.values))),
+        ))
+    for number, row_errors in result.row_errors():
+        errors.append(ImportJobError(
+            job=job,
+            row=offset + number,
+            type=ImportJobError.ERROR,
+            errors=[str(error.error) for error in row_errors],
+            values=to_json(dict(row_errors[0].row)) if row_errors[0].row else {},
+        ))
+    return errors
+
+
+def run_import_job(job_id):
+    """
+    Importa el archivo de un ImportJob en una sola pasada: los bloques se
+    guardan dentro de una transacción que se revierte si hubo errores o si el
+    job es de validación (dry_run), lo que reemplaza la doble importación.
+    """
+    job = ImportJob.objects.get(id=job_id)
+    job.status = ImportJob.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at', 'updated'])
+
+    errors = []
+    totals = Counter()
+    try:
+        resource = import_string(job.resource)()
+        with job.file.open('rb') as file:
+            dataset = load_dataset(file, file_format(job.file.name))
+        job.total_rows = len(dataset)
+        job.save(update_fields=['total_rows', 'updated'])
+
+        with transaction.atomic():
+            for offset, chunk in iter_chunks(dataset, IMPORT_CHUNK_SIZE):
+                result = resource.import_data(chunk, dry_run=False, use_transactions=True)
+                totals.update(result.totals)
+                errors.extend(collect_errors(job, result, chunk.headers, offset))
+                if result.base_errors:
+                    raise ValueError('; '.join(str(error.error) for error in result.base_errors))
+                cache.set(progress_cache_key(job.id), offset + len(chunk), PROGRESS_TIMEOUT)
+            if errors or job.dry_run:
+                transaction.set_rollback(True)
+    except Exception as e:
+        job.error = str(e)
+
+    ImportJobError.objects.bulk_create(errors, batch_size=IMPORT_CHUNK_SIZE)
+    job.totals = dict(totals)
+    job.processed_rows = cache.get(progress_cache_key(job.id), 0)
+    job.status = ImportJob.FAILED if errors or job.error else ImportJob.SUCCESS
+    job.finished_at = timezone.now()
+    job.save()
+    cache.delete(progress_cache_key(job.id))
+    return job.status
+
+
+class ImportMixin:
+    """
+    Acción _import compartida: guarda el archivo (o los datos enviados como
+    headers/data), crea un ImportJob y lo procesa en Celery. El estado y los
+    errores por fila se consultan en /api/setting/import_job/<id>/.
+    """
+    import_resource_class = None
+
+    def get_import_resource_class(self):
+        return self.import_resource_class or getattr(self, 'export_resource_class', None)
+
+    def get_import_file(self, request):
+        if request.FILES:
+            return request.FILES['file']
+        data_set = tablib.Dataset(headers=request.data['headers'])
+        for d in request.data['data']:
+            data_set.append(d)
+        return ContentFile(data_set.export('csv').encode('utf-8'), name='import.csv')
+
+    @action(methods=['POST'], detail=False)
+    def _import(self, request):
+        from apps.setting.serializers import ImportJobSerializer
+        from apps.setting.tasks import process_import_job
+
+        resource_class = self.get_import_resource_class()
+        try:
+            import_file = self.get_import_file(request)
+        except (KeyError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ImportJob.objects.create(
+            resource='{0}.{1}'.format(resource_class.__module__, resource_class.__name__),
+            file=import_file,
+            dry_run=bool(request.query_params.get('dry_run', None)),
+            created_by=request.user if request.user.is_authenticated else None,
+        )
+        job_id = str(job.id)
+        transaction.on_commit(lambda: process_import_job.delay(job_id))
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
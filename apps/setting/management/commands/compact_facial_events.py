@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.customers.utils import iter_tenants
+from apps.setting.models import EVENT_KEY_SQL, FacialRecognitionEvent
+
+TABLE = FacialRecognitionEvent._meta.db_table
+
+
+class Command(BaseCommand):
+    help = ("Calcula event_key de los eventos de reconocimiento facial existentes y elimina los duplicados "
+            "(se conserva el primero recibido) en todos los schemas. Fase 2 de la migración 0012; se puede "
+            "interrumpir y volver a ejecutar.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Filas por lote")
+
+    def handle(self, *args, **options):
+        for tenant in iter_tenants(options['schema']):
+            updated, deleted = self.compact(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                "%s: %s eventos con clave nueva, %s duplicados eliminados" % (tenant.schema_name, updated, deleted)
+            ))
+
+    @staticmethod
+    def compact(batch_size):
+        """
+        Recorre la tabla por rangos de id; cada lote se confirma por separado
+        para no bloquear la tabla mientras los dispositivos siguen enviando.
+        Los ids menores ya tienen clave, así que un duplicado del lote se
+        detecta contra ellos con el índice de event_key.
+        """
+        updated = deleted = 0
+        last_id = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    "SELECT max(id) FROM (SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s) batch".format(
+                        table=TABLE),
+                    [last_id, batch_size]
+                )
+                upper_id = cursor.fetchone()[0]
+                if upper_id is None:
+                    break
+                cursor.execute(
+                    "UPDATE {table} SET event_key = {key} "
+                    "WHERE id > %s AND id <= %s AND event_key IS NULL".format(table=TABLE, key=EVENT_KEY_SQL),
+                    [last_id, upper_id]
+                )
+                updated += cursor.rowcount
+                cursor.execute(
+                    "DELETE FROM {table} duplicate WHERE duplicate.id > %s AND duplicate.id <= %s AND EXISTS ("
+                    "SELECT 1 FROM {table} original "
+                    "WHERE original.event_key = duplicate.event_key AND original.id < duplicate.id)".format(
+                        table=TABLE),
+                    [last_id, upper_id]
+                )
+                deleted += cursor.rowcount
+                last_id = upper_id
+        return updated, deleted
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.customers.utils import iter_tenants
+from apps.setting.models import FacialRecognitionEvent
+
+TABLE = FacialRecognitionEvent._meta.db_table
+OLD_TABLE = TABLE + '_old'
+
+
+class Command(BaseCommand):
+    help = ("Copia en lotes los eventos de reconocimiento facial de la tabla anterior a la particionada "
+            "(migración setting 0014) y elimina la tabla anterior. Se puede interrumpir y volver a ejecutar.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Filas por lote")
+
+    def handle(self, *args, **options):
+        for tenant in iter_tenants(options['schema']):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s)", [OLD_TABLE])
+                if cursor.fetchone()[0] is None:
+                    continue
+            copied = self.copy(options['batch_size'])
+            with connection.cursor() as cursor:
+                cursor.execute("DROP TABLE {old}".format(old=OLD_TABLE))
+            self.stdout.write(self.style.SUCCESS("%s: %s eventos copiados" % (tenant.schema_name, copied)))
+
+    @staticmethod
+    def copy(batch_size):
+        """
+        Recorre la tabla anterior por (event_time, id); cada lote se confirma por
+        separado para no bloquear la ingesta ni acumular WAL en una sola
+        transacción. ON CONFLICT descarta lo copiado en una ejecución anterior.
+        """
+        copied = 0
+        last = None
+        with connection.cursor() as cursor:
+            while True:
+                condition, params = '', []
+                if last:
+                    condition, params = 'WHERE (event_time, id) > (%s, %s)', list(last)
+                cursor.execute(
+                    "SELECT event_time, id FROM (SELECT event_time, id FROM {old} {condition} "
+                    "ORDER BY event_time, id LIMIT %s) batch ORDER BY event_time DESC, id DESC LIMIT 1".format(
+                        old=OLD_TABLE, condition=condition),
+                    params + [batch_size]
+                )
+                upper = cursor.fetchone()
+                if upper is None:
+                    return copied
+                lower_condition = '(event_time, id) > (%s, %s) AND ' if last else ''
+                cursor.execute(
+                    "INSERT INTO {table} SELECT * FROM {old} WHERE {lower}(event_time, id) <= (%s, %s) "
+                    "ON CONFLICT DO NOTHING".format(table=TABLE, old=OLD_TABLE, lower=lower_condition),
+                    params + list(upper)
+                )
+                copied += cursor.rowcount
+                last = upper
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.customers.utils import iter_tenants
+from apps.setting.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla de ocupación desde el historial de eventos de reconocimiento facial en todos los schemas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Procesar solo este schema")
+
+    def handle(self, *args, **options):
+        for tenant in iter_tenants(options['schema']):
+            rows = rebuild_occupancy()
+            self.stdout.write(self.style.SUCCESS("%s: %s registros de ocupación" % (tenant.schema_name, rows)))
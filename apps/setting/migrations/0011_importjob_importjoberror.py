@@ -0,0 +1,56 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import apps.setting.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('setting', '0010_facialrecognitionevent_user_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('resource', models.CharField(help_text='Ruta del Resource de import_export a utilizar', max_length=255, verbose_name='resource')),
+                ('file', models.FileField(upload_to=apps.setting.models.import_job_path, verbose_name='file')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('success', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=10, verbose_name='status')),
+                ('dry_run', models.BooleanField(default=False, help_text='Solo validar, sin guardar los registros')),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('totals', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='created_by')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportJobError',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('row', models.PositiveIntegerField(verbose_name='row')),
+                ('type', models.CharField(choices=[('error', 'Error'), ('invalid', 'Inválido')], default='error', max_length=10, verbose_name='type')),
+                ('errors', models.JSONField(default=list)),
+                ('values', models.JSONField(default=dict)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='errors', to='setting.importjob', verbose_name='job')),
+            ],
+            options={
+                'ordering': ['row'],
+            },
+        ),
+    ]
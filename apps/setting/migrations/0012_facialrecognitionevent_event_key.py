@@ -0,0 +1,31 @@
+# Clave determinística de los eventos de reconocimiento facial para descartar
+# los reenvíos de los dispositivos (INSERT ... ON CONFLICT DO NOTHING), en tres
+# fases para no bloquear la tabla mientras los dispositivos siguen enviando:
+#   1. Esta migración agrega la columna (nullable) y un índice no único para
+#      ubicar duplicados.
+#   2. `manage.py compact_facial_events` calcula las claves y elimina los
+#      duplicados en lotes.
+#   3. La 0013 crea el índice único con CREATE UNIQUE INDEX CONCURRENTLY.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('setting', '0011_importjob_importjoberror'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facialrecognitionevent',
+            name='event_key',
+            field=models.CharField(editable=False, help_text='md5 de ubicación, usuario, fecha y movimiento; evita eventos repetidos', max_length=32, null=True),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS setting_facialrecognitionevent_event_key_idx "
+            "ON setting_facialrecognitionevent (event_key)",
+            "DROP INDEX CONCURRENTLY IF EXISTS setting_facialrecognitionevent_event_key_idx",
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Fase 3 de event_key (ver 0012): requiere haber ejecutado antes
+# `manage.py compact_facial_events`; si quedan duplicados la creación falla y
+# basta con volver a ejecutar el comando y la migración.
+
+from django.db import migrations, models
+
+INDEX = 'setting_facialrecognitionevent_event_key_uniq'
+
+
+def create_unique_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        # Un intento fallido de CREATE INDEX CONCURRENTLY deja el índice inválido
+        cursor.execute(
+            "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid", [INDEX]
+        )
+        if cursor.fetchone():
+            cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS %s" % INDEX)
+    schema_editor.execute(
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS %s ON setting_facialrecognitionevent (event_key)" % INDEX
+    )
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS setting_facialrecognitionevent_event_key_idx")
+
+
+def drop_unique_index(apps, schema_editor):
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS setting_facialrecognitionevent_event_key_idx "
+        "ON setting_facialrecognitionevent (event_key)"
+    )
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS %s" % INDEX)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('setting', '0012_facialrecognitionevent_event_key'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_unique_index, drop_unique_index),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='facialrecognitionevent',
+                    name='event_key',
+                    field=models.CharField(editable=False, help_text='md5 de ubicación, usuario, fecha y movimiento; evita eventos repetidos', max_length=32, null=True, unique=True),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,129 @@
+# Particiona setting_facialrecognitionevent por mes de event_time (RANGE).
+# La clave primaria pasa a (id, event_time) y el índice único de event_key
+# incluye event_time, como exige PostgreSQL en tablas particionadas; id sigue
+# siendo único porque sale de la misma secuencia. Las filas fuera de las
+# particiones creadas caen en la partición por defecto, que
+# setting_facial_event_ensure_partitions vacía al crear el mes correspondiente.
+#
+# La migración solo renombra la tabla a setting_facialrecognitionevent_old y
+# crea la particionada vacía con el nombre original, así la ingesta sigue sin
+# esperar. Las filas existentes se copian en lotes por event_time con
+# `manage.py migrate_facial_event_partitions`, que al terminar elimina la tabla
+# vieja. Mientras tanto las consultas no ven los eventos anteriores a la
+# migración (la verificación de acceso usa solo los últimos minutos).
+
+from django.db import migrations, models
+
+ENSURE_PARTITIONS_SQL = """
+CREATE OR REPLACE FUNCTION setting_facial_event_ensure_partitions(months_ahead integer DEFAULT 3, since date DEFAULT NULL)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', coalesce(since, current_date))::date;
+    last_month date := (date_trunc('month', current_date) + make_interval(months => months_ahead))::date;
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        partition_name := 'setting_facialrecognitionevent_p' || to_char(month_start, 'YYYYMM');
+        lower_bound := month_start::timestamp AT TIME ZONE 'UTC';
+        upper_bound := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+        IF to_regclass(format('%I.%I', current_schema(), partition_name)) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE setting_facialrecognitionevent INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM setting_facialrecognitionevent_default '
+                'WHERE event_time >= %L AND event_time < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                lower_bound, upper_bound, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE setting_facialrecognitionevent ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+FORWARD_SQL = """
+ALTER SEQUENCE setting_facialrecognitionevent_id_seq OWNED BY NONE;
+ALTER TABLE setting_facialrecognitionevent RENAME TO setting_facialrecognitionevent_old;
+-- RENAME no renombra los índices: se liberan sus nombres para la tabla nueva
+ALTER TABLE setting_facialrecognitionevent_old
+    RENAME CONSTRAINT setting_facialrecognitionevent_pkey TO setting_facialrecognitionevent_old_pkey;
+ALTER INDEX setting_fac_user_id_db0bb8_idx RENAME TO setting_fac_user_id_db0bb8_idx_old;
+ALTER INDEX setting_fac_event_t_ee94bc_idx RENAME TO setting_fac_event_t_ee94bc_idx_old;
+ALTER INDEX setting_facialrecognitionevent_event_key_uniq RENAME TO setting_facialrecognitionevent_event_key_uniq_old;
+
+CREATE TABLE setting_facialrecognitionevent (LIKE setting_facialrecognitionevent_old INCLUDING DEFAULTS)
+    PARTITION BY RANGE (event_time);
+CREATE TABLE setting_facialrecognitionevent_default PARTITION OF setting_facialrecognitionevent DEFAULT;
+""" + ENSURE_PARTITIONS_SQL + """
+SELECT setting_facial_event_ensure_partitions(3, (SELECT min(event_time) FROM setting_facialrecognitionevent_old)::date);
+
+ALTER TABLE setting_facialrecognitionevent ADD PRIMARY KEY (id, event_time);
+CREATE INDEX setting_fac_user_id_db0bb8_idx ON setting_facialrecognitionevent (user_id);
+CREATE INDEX setting_fac_event_t_ee94bc_idx ON setting_facialrecognitionevent (event_time);
+CREATE UNIQUE INDEX setting_facialrecognitionevent_event_key_uniq
+    ON setting_facialrecognitionevent (event_key, event_time);
+ALTER SEQUENCE setting_facialrecognitionevent_id_seq OWNED BY setting_facialrecognitionevent.id;
+"""
+
+REVERSE_SQL = """
+DO $$
+BEGIN
+    IF to_regclass('setting_facialrecognitionevent_old') IS NOT NULL THEN
+        RAISE EXCEPTION 'Ejecute migrate_facial_event_partitions antes de revertir';
+    END IF;
+END;
+$$;
+
+ALTER SEQUENCE setting_facialrecognitionevent_id_seq OWNED BY NONE;
+ALTER TABLE setting_facialrecognitionevent RENAME TO setting_facialrecognitionevent_partitioned;
+ALTER TABLE setting_facialrecognitionevent_partitioned
+    RENAME CONSTRAINT setting_facialrecognitionevent_pkey TO setting_facialrecognitionevent_partitioned_pkey;
+ALTER INDEX setting_fac_user_id_db0bb8_idx RENAME TO setting_fac_user_id_db0bb8_idx_partitioned;
+ALTER INDEX setting_fac_event_t_ee94bc_idx RENAME TO setting_fac_event_t_ee94bc_idx_partitioned;
+ALTER INDEX setting_facialrecognitionevent_event_key_uniq RENAME TO setting_facialrecognitionevent_event_key_uniq_partitioned;
+
+CREATE TABLE setting_facialrecognitionevent (LIKE setting_facialrecognitionevent_partitioned INCLUDING DEFAULTS);
+INSERT INTO setting_facialrecognitionevent SELECT * FROM setting_facialrecognitionevent_partitioned;
+DROP TABLE setting_facialrecognitionevent_partitioned CASCADE;
+DROP FUNCTION IF EXISTS setting_facial_event_ensure_partitions(integer, date);
+
+ALTER TABLE setting_facialrecognitionevent ADD PRIMARY KEY (id);
+CREATE INDEX setting_fac_user_id_db0bb8_idx ON setting_facialrecognitionevent (user_id);
+CREATE INDEX setting_fac_event_t_ee94bc_idx ON setting_facialrecognitionevent (event_time);
+CREATE UNIQUE INDEX setting_facialrecognitionevent_event_key_uniq ON setting_facialrecognitionevent (event_key);
+ALTER SEQUENCE setting_facialrecognitionevent_id_seq OWNED BY setting_facialrecognitionevent.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setting', '0013_facialrecognitionevent_event_key_uniq'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='facialrecognitionevent',
+                    name='event_key',
+                    field=models.CharField(editable=False, help_text='md5 de ubicación, usuario, fecha y movimiento; evita eventos repetidos', max_length=32, null=True),
+                ),
+                migrations.AddConstraint(
+                    model_name='facialrecognitionevent',
+                    constraint=models.UniqueConstraint(fields=('event_key', 'event_time'), name='setting_facialrecognitionevent_event_key_uniq'),
+                ),
+            ],
+        ),
+    ]
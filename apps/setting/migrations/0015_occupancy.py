@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('setting', '0014_partition_facialrecognitionevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Occupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(blank=True, default='', max_length=100)),
+                ('user_id', models.CharField(max_length=100)),
+                ('user_name', models.CharField(max_length=255, null=True, verbose_name='user name')),
+                ('movement_type', models.CharField(choices=[('IN', 'Entrada'), ('OUT', 'Salida')], max_length=3, verbose_name='movement_type')),
+                ('event_time', models.DateTimeField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['location', 'event_time'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupancy',
+            constraint=models.UniqueConstraint(fields=('location', 'user_id'), name='setting_occupancy_location_user_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='occupancy',
+            index=models.Index(fields=['location', 'movement_type', 'event_time'], name='setting_occupancy_inside_idx'),
+        ),
+    ]
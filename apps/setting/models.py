@@ -1,5 +1,10 @@
+import hashlib
+import math
+from datetime import timedelta
+
 from django.contrib.auth.models import Group
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from apps.core.models import ModelBase, TypeNews
@@ -87,7 +92,23 @@ class Notification(ModelBase):
         return "{description}".format(description=self.description)
 
 
+RECENT_EVENT_MINUTES = 5
+
+
+class FacialRecognitionEventQuerySet(models.QuerySet):
+
+    def recent(self, minutes=RECENT_EVENT_MINUTES):
+        """
+        Eventos de los últimos minutos. El límite superior hace que PostgreSQL
+        descarte todas las particiones salvo la del mes en curso (y la
+        siguiente cerca del cambio de mes).
+        """
+        now = timezone.now()
+        return self.filter(event_time__gte=now - timedelta(minutes=minutes), event_time__lt=now + timedelta(days=1))
+
+
 class FacialRecognitionEvent(models.Model):
+    """ Tabla particionada por mes de event_time (migración 0014) """
     IN = "IN"
     OUT = "OUT"
 
@@ -101,13 +122,117 @@ class FacialRecognitionEvent(models.Model):
     ))
     location = models.CharField(max_length=100, default=None, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    event_key = models.CharField(max_length=32, null=True, editable=False,
+                                 help_text="md5 de ubicación, usuario, fecha y movimiento; evita eventos repetidos")
+
+    objects = FacialRecognitionEventQuerySet.as_manager()
 
     class Meta:
         indexes = [
             models.Index(fields=['user_id']),
             models.Index(fields=['event_time']),
         ]
+        constraints = [
+            # En tablas particionadas los índices únicos deben incluir la clave de partición
+            models.UniqueConstraint(fields=['event_key', 'event_time'], name='setting_facialrecognitionevent_event_key_uniq'),
+        ]
         ordering = ['-event_time']
 
     def __str__(self):
-        return f"{self.user_id} - {self.event_time}"
\ No newline at end of file
+        return f"{self.user_id} - {self.event_time}"
+
+    @staticmethod
+    def build_event_key(location, user_id, event_time, movement_type):
+        # Debe coincidir con EVENT_KEY_SQL (compact_facial_events)
+        value = '{0}|{1}|{2}|{3}'.format(location or '', user_id, math.floor(event_time.timestamp()), movement_type)
+        return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.event_key = self.build_event_key(self.location, self.user_id, self.event_time, self.movement_type)
+        super().save(*args, **kwargs)
+
+
+EVENT_KEY_SQL = (
+    "md5(concat_ws('|', coalesce(location, ''), user_id, "
+    "floor(extract(epoch from event_time))::bigint, movement_type))"
+)
+
+
+class Occupancy(models.Model):
+    """
+    Último movimiento de cada persona por ubicación, mantenido por la ingesta
+    de eventos faciales (apps.api.ingest) en la misma transacción del insert.
+    Con movement_type IN la persona está dentro.
+    """
+    location = models.CharField(max_length=100, default='', blank=True)
+    user_id = models.CharField(max_length=100)
+    user_name = models.CharField(max_length=255, verbose_name=_('user name'), null=True)
+    movement_type = models.CharField(max_length=3, verbose_name="movement_type",
+                                     choices=FacialRecognitionEvent._meta.get_field('movement_type').choices)
+    event_time = models.DateTimeField()
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'user_id'], name='setting_occupancy_location_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['location', 'movement_type', 'event_time'], name='setting_occupancy_inside_idx'),
+        ]
+        ordering = ['location', 'event_time']
+
+    def __str__(self):
+        return f"{self.location} - {self.user_id} ({self.movement_type})"
+
+
+def import_job_path(job: 'ImportJob', file_name):
+    return 'imports/{0}/{1}'.format(job.id, file_name)
+
+
+class ImportJob(ModelBase):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+    resource = models.CharField(max_length=255, verbose_name="resource",
+                                help_text="Ruta del Resource de import_export a utilizar")
+    file = models.FileField(verbose_name=_('file'), upload_to=import_job_path)
+    status = models.CharField(default=PENDING, max_length=10, verbose_name="status", choices=(
+        (PENDING, _('Pendiente')),
+        (RUNNING, _('En proceso')),
+        (SUCCESS, _('Completado')),
+        (FAILED, _('Fallido')),
+    ))
+    dry_run = models.BooleanField(default=False, help_text="Solo validar, sin guardar los registros")
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    totals = models.JSONField(default=dict)
+    error = models.TextField(null=True, blank=True)
+    created_by = models.ForeignKey('security.User', verbose_name=_('created_by'), on_delete=models.SET_NULL,
+                                   null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return f"{self.resource} - {self.status}"
+
+
+class ImportJobError(ModelBase):
+    ERROR = "error"
+    INVALID = "invalid"
+
+    job = models.ForeignKey(ImportJob, verbose_name=_('job'), related_name='errors', on_delete=models.CASCADE)
+    row = models.PositiveIntegerField(verbose_name="row")
+    type = models.CharField(default=ERROR, max_length=10, verbose_name="type", choices=(
+        (ERROR, _('Error')),
+        (INVALID, _('Inválido')),
+    ))
+    errors = models.JSONField(default=list)
+    values = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['row']
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.setting.models import FacialRecognitionEvent, Occupancy
+
+OVERDUE_HOURS = getattr(settings, 'OCCUPANCY_OVERDUE_HOURS', 12)
+
+UPSERT_BATCH_SIZE = 1000
+
+# Solo se reemplaza el estado si el evento es más nuevo: los eventos atrasados
+# o reenviados no deshacen un movimiento posterior
+UPSERT_SQL = """
+INSERT INTO setting_occupancy (location, user_id, user_name, movement_type, event_time, updated)
+VALUES {values}
+ON CONFLICT (location, user_id) DO UPDATE SET
+    user_name = coalesce(EXCLUDED.user_name, setting_occupancy.user_name),
+    movement_type = EXCLUDED.movement_type,
+    event_time = EXCLUDED.event_time,
+    updated = EXCLUDED.updated
+WHERE setting_occupancy.event_time < EXCLUDED.event_time
+"""
+
+REBUILD_SQL = """
+INSERT INTO setting_occupancy (location, user_id, user_name, movement_type, event_time, updated)
+SELECT DISTINCT ON (coalesce(location, ''), user_id)
+       coalesce(location, ''), user_id, user_name, movement_type, event_time, now()
+FROM setting_facialrecognitionevent
+ORDER BY coalesce(location, ''), user_id, event_time DESC, id DESC
+"""
+
+
+def update_occupancy(events):
+    """ Aplica a la tabla de ocupación el último evento de cada (ubicación, usuario) del lote """
+    latest = {}
+    for event in events:
+        key = (event.location or '', event.user_id)
+        if key not in latest or latest[key].event_time < event.event_time:
+            latest[key] = event
+    if not latest:
+        return 0
+
+    now = timezone.now()
+    rows = [
+        (location, user_id, event.user_name, event.movement_type, event.event_time, now)
+        for (location, user_id), event in latest.items()
+    ]
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[offset:offset + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                UPSERT_SQL.format(values=', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))),
+                [value for row in batch for value in row]
+            )
+    return len(rows)
+
+
+def rebuild_occupancy():
+    """ Reconstruye la ocupación del schema actual a partir del historial de eventos """
+    with transaction.atomic():
+        Occupancy.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL)
+            return cursor.rowcount
+
+
+def headcount():
+    """ Personas dentro por ubicación """
+    return Occupancy.objects.filter(movement_type=FacialRecognitionEvent.IN).values('location').annotate(
+        inside=Count('id')
+    ).order_by('location')
+
+
+def overdue(hours=OVERDUE_HOURS):
+    """ Personas dentro cuya entrada tiene más de hours horas """
+    return Occupancy.objects.filter(
+        movement_type=FacialRecognitionEvent.IN, event_time__lt=timezone.now() - timedelta(hours=hours)
+    )
@@ -0,0 +1,114 @@
+import gzip
+import logging
+import re
+import tempfile
+from datetime import date
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from apps.setting.models import FacialRecognitionEvent
+
+logger = logging.getLogger(__name__)
+
+TABLE = FacialRecognitionEvent._meta.db_table
+PARTITION_NAME = re.compile(r'^' + TABLE + r'_p(\d{4})(\d{2})$')
+
+MONTHS_AHEAD = 3
+
+ARCHIVE_PATH = 'archives/facial_events/{0}.csv.gz'
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD):
+    """ Crea las particiones mensuales que falten hasta months_ahead meses adelante; devuelve cuántas creó """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT setting_facial_event_ensure_partitions(%s)", [months_ahead])
+        return cursor.fetchone()[0]
+
+
+def parse_partitions(names):
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def list_partitions():
+    """ [(primer día del mes, nombre de la partición)] del schema actual, de la más antigua a la más nueva """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.oid = %s::regclass",
+            [TABLE]
+        )
+        return parse_partitions(row[0] for row in cursor.fetchall())
+
+
+def list_detached_partitions():
+    """ Particiones ya separadas que no se llegaron a eliminar (p. ej. falló el archivado) """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class "
+            "WHERE relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema()) "
+            "AND relkind = 'r' AND relname LIKE %s "
+            "AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = pg_class.oid)",
+            [TABLE + '\\_p%']
+        )
+        return parse_partitions(row[0] for row in cursor.fetchall())
+
+
+def retention_cutoff(months, today=None):
+    """ Primer mes que se conserva: el actual y los months - 1 anteriores """
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_partition(name, month):
+    """ Copia la partición a un CSV comprimido en el storage del tenant y devuelve la ruta """
+    with tempfile.TemporaryFile() as file:
+        with gzip.GzipFile(fileobj=file, mode='wb') as gzip_file:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    'COPY (SELECT * FROM "{0}" ORDER BY event_time) TO STDOUT WITH CSV HEADER'.format(name), gzip_file
+                )
+        file.seek(0)
+        return default_storage.save(ARCHIVE_PATH.format(month.strftime('%Y%m')), File(file))
+
+
+def apply_retention(tenant, today=None):
+    """
+    Separa y elimina las particiones anteriores a la retención del tenant,
+    archivándolas antes si así está configurado. Devuelve los meses eliminados.
+
+    El DETACH toma un ACCESS EXCLUSIVE sobre la tabla padre, así que se
+    confirma solo en su propia transacción; el archivado y el DROP se hacen
+    después, sin bloquear las inserciones de los dispositivos. Si el
+    archivado falla, la partición queda separada y se retoma en la siguiente
+    ejecución.
+    """
+    months = tenant.facial_events_retention_months
+    if not months:
+        return []
+    cutoff = retention_cutoff(months, today)
+    detached = list_detached_partitions()
+    detached_names = {name for month, name in detached}
+    removed = []
+    for month, name in sorted(list_partitions() + detached):
+        if month >= cutoff:
+            break
+        if name not in detached_names:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute('ALTER TABLE "{0}" DETACH PARTITION "{1}"'.format(TABLE, name))
+        if tenant.facial_events_archive:
+            path = archive_partition(name, month)
+            logger.info("Partición %s de %s archivada en %s", name, tenant.schema_name, path)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE "{0}"'.format(name))
+        removed.append(month)
+    return removed
@@ -18,7 +18,7 @@ from apps.customers.models import Client
 from apps.main.models import Schedule
 from apps.main.serializers import ScheduleDefaultSerializer
 from apps.security.serializers import RoleDefaultSerializer
-from apps.setting.models import Notification, FacialRecognitionEvent
+from apps.setting.models import Notification, FacialRecognitionEvent, ImportJob, ImportJobError, Occupancy
 
 
 class NotificationDefaultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
@@ -384,4 +384,37 @@ class FacialRecognitionEventSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = FacialRecognitionEvent
-        fields = serializers.ALL_FIELDS
\ No newline at end of file
+        fields = serializers.ALL_FIELDS
+
+
+class OccupancySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Occupancy
+        fields = serializers.ALL_FIELDS
+
+
+class ImportJobErrorSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ImportJobError
+        fields = ('row', 'type', 'errors', 'values')
+
+
+class ImportJobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    processed_rows = serializers.SerializerMethodField(read_only=True)
+    errors_count = serializers.SerializerMethodField(read_only=True)
+
+    def get_processed_rows(self, obj):
+        from apps.setting.imports import get_progress
+        return get_progress(obj)
+
+    def get_errors_count(self, obj):
+        if hasattr(obj, 'errors_total'):
+            return obj.errors_total
+        return obj.errors.count()
+
+    class Meta:
+        model = ImportJob
+        exclude = ('file',)
@@ -73,3 +73,20 @@ def generate_notification_not_fulfilled(notification_id: str, schedule_id: str):
                 )
     except ObjectDoesNotExist:
         pass
+
+
+@app.task
+def process_import_job(job_id):
+    from apps.setting.imports import run_import_job
+
+    return run_import_job(job_id)
+
+
+@app.task
+def maintain_facial_event_partitions(schema_name=None):
+    from apps.customers.utils import iter_tenants
+    from apps.setting.partitions import apply_retention, ensure_partitions
+
+    for tenant in iter_tenants(schema_name):
+        ensure_partitions()
+        apply_retention(tenant)
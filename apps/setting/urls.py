@@ -1,5 +1,6 @@
 from rest_framework import routers
-from .views import NotificationViewSet, IbartiViewSet, TaskResultViewSet, PeriodicTaskViewSet, FacialRecognitionEventViewSet
+from .views import NotificationViewSet, IbartiViewSet, TaskResultViewSet, PeriodicTaskViewSet, FacialRecognitionEventViewSet, \
+    ImportJobViewSet, OccupancyViewSet
 
 router = routers.SimpleRouter()
 router.register(r'notification', NotificationViewSet)
@@ -7,6 +8,8 @@ router.register(r'ibarti', IbartiViewSet, basename='ibarti')
 router.register(r'task_results', TaskResultViewSet)
 router.register(r'periodic_task', PeriodicTaskViewSet)
 router.register(r'facial-recognition', FacialRecognitionEventViewSet)
+router.register(r'import_job', ImportJobViewSet)
+router.register(r'occupancy', OccupancyViewSet)
 
 urlpatterns = [
 ]
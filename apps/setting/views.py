@@ -1,8 +1,9 @@
+import math
 import time
 import json
-import tablib
 import requests
 from django.conf import settings
+from django.db.models import Count
 from django_celery_beat.models import PeriodicTask
 from django_celery_results.models import TaskResult
 from django_filters.rest_framework import DjangoFilterBackend
@@ -13,28 +14,36 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from tablib import Dataset
 from django_filters import rest_framework as filters
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+from apps.core.pagination import CursorPaginationMixin, FacialRecognitionEventCursorPagination
+from apps.core.exports import ExportMixin
+from apps.core.streaming import StreamingListMixin
 from apps.main.models import News, Location, Material
 from apps.main.serializers import NewsDefaultSerializer, MaterialScopeSerializer
 from apps.setting.admin import NotificationResource
-from apps.setting.models import Notification, FacialRecognitionEvent
+from apps.setting.models import Notification, FacialRecognitionEvent, ImportJob, Occupancy
+from apps.setting.occupancy import OVERDUE_HOURS, headcount, overdue
 from apps.setting.serializers import NotificationDefaultSerializer, TaskResultDefaultSerializer, \
-    PeriodicTaskDefaultSerializer, FacialRecognitionEventSerializer
+    PeriodicTaskDefaultSerializer, FacialRecognitionEventSerializer, ImportJobSerializer, ImportJobErrorSerializer, \
+    OccupancySerializer
 
 from apps.setting.tasks import generate_notification_async, generate_notification_not_fulfilled
+from apps.setting.imports import ImportMixin
 
 
-class NotificationViewSet(ModelViewSet):
+class NotificationViewSet(ImportMixin, ExportMixin, StreamingListMixin, ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationDefaultSerializer
+    export_resource_class = NotificationResource
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['description']
     permission_classes = (AllowAny,)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_requested():
+            return self.stream_response(queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -59,65 +68,6 @@ class NotificationViewSet(ModelViewSet):
         generate_notification_not_fulfilled.delay(_id)
         return Response({}, status=status.HTTP_200_OK)
 
-    @action(methods=['GET'], detail=False)
-    def export(self, request):
-        dataset = NotificationResource().export()
-        return Response(dataset.csv, status=status.HTTP_200_OK)
-
-    @action(methods=['POST'], detail=False)
-    def _import(self, request):
-        try:
-            resource = NotificationResource()
-            errors = []
-            invalids = []
-            if request.FILES:
-                file = request.FILES['file']
-                data_set = Dataset()
-                data_set.load(file.read())
-                result = resource.import_data(data_set, dry_run=True)  # Test the data import
-            else:
-                headers = request.data['headers']
-                data_set = tablib.Dataset(headers=headers)
-                for d in request.data['data']:
-                    data_set.append(d)
-                result = resource.import_data(data_set, dry_run=True)
-
-            if result.has_errors() or len(result.invalid_rows) > 0:
-                for row in result.invalid_rows:
-                    invalids.append(
-                        {
-                            "row": row.number + 1,
-                            "error": row.error,
-                            "error_dict": row.error_dict,
-                            "values": row.values
-                        }
-                    )
-
-                for row in result.row_errors():
-                    err = row[1]
-                    errors.append(
-                        {
-                            "errors": [e.error.__str__() for e in err],
-                            "values": err[0].row,
-                            "row": row[0]
-                        }
-                    )
-
-                return Response({
-                    "rows_error": errors,
-                    "invalid_rows": invalids,
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                result = resource.import_data(data_set, dry_run=False)  # Actually import now
-                return Response({
-                    "totals": result.totals,
-                    "total_rows": result.total_rows,
-                }, status=status.HTTP_200_OK)
-        except ValueError as e:
-            return Response(e, status=status.HTTP_400_BAD_REQUEST)
-
     @action(methods=['GET'], detail=False)
     def field_options(self, request):
         field = self.request.query_params.get('field', None)
@@ -348,7 +298,7 @@ class TaskResultFilter(filters.FilterSet):
         return queryset
 
 
-class TaskResultViewSet(ModelViewSet):
+class TaskResultViewSet(StreamingListMixin, ModelViewSet):
     queryset = TaskResult.objects.all()
     serializer_class = TaskResultDefaultSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -405,17 +355,17 @@ class PeriodicTaskViewSet(ModelViewSet):
 
 
 
-class FacialRecognitionEventViewSet(ModelViewSet):
+class FacialRecognitionEventViewSet(StreamingListMixin, CursorPaginationMixin, ModelViewSet):
     queryset = FacialRecognitionEvent.objects.all()
     serializer_class = FacialRecognitionEventSerializer
+    cursor_pagination_class = FacialRecognitionEventCursorPagination
     permission_classes = (AllowAny,)
 
     def get_queryset(self):
         queryset = super(FacialRecognitionEventViewSet, self).get_queryset()
         recent = self.request.query_params.get('recent', None)
         if recent:
-            time_threshold = datetime.now() - timedelta(minutes=5)
-            return queryset.filter(event_time__gte=time_threshold)
+            return queryset.recent()
         else:
             return queryset
 
@@ -427,3 +377,67 @@ class FacialRecognitionEventViewSet(ModelViewSet):
         if self.paginator is None or not_paginator:
             return None
         return self.paginator.paginate_queryset(queryset, self.request, view=self)
+
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ImportJob.objects.annotate(errors_total=Count('errors'))
+    serializer_class = ImportJobSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'resource']
+
+    @action(methods=['GET'], detail=True)
+    def errors(self, request, pk=None):
+        job = self.get_object()
+        queryset = job.errors.all()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = ImportJobErrorSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = ImportJobErrorSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class OccupancyViewSet(StreamingListMixin, viewsets.ReadOnlyModelViewSet):
+    """ Ocupación actual por ubicación según los eventos de reconocimiento facial IN/OUT """
+    queryset = Occupancy.objects.all()
+    serializer_class = OccupancySerializer
+    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filterset_fields = ['location', 'movement_type', 'user_id']
+    search_fields = ['user_id', 'user_name']
+    permission_classes = (AllowAny,)
+
+    @action(methods=['GET'], detail=False)
+    def headcount(self, request):
+        """ Personas dentro por ubicación; ?location= limita a una ubicación """
+        queryset = headcount()
+        location = request.query_params.get('location', None)
+        if location is not None:
+            queryset = queryset.filter(location=location)
+        return Response(list(queryset))
+
+    @action(methods=['GET'], detail=False)
+    def overdue(self, request):
+        """ Personas dentro desde hace más de ?hours= horas (por defecto OCCUPANCY_OVERDUE_HOURS) """
+        try:
+            hours = float(request.query_params.get('hours', OVERDUE_HOURS))
+            if not math.isfinite(hours) or hours < 0:
+                raise ValueError
+            queryset = overdue(hours)
+        except (ValueError, OverflowError):
+            return Response({"error": "hours debe ser un número positivo"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(queryset)
+        if self.stream_requested():
+            return self.stream_response(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    def paginate_queryset(self, queryset):
+        """
+        Return a single page of results, or `None` if pagination is disabled.
+        """
+        not_paginator = self.request.query_params.get('not_paginator', None)
+        if self.paginator is None or not_paginator:
+            return None
+        return self.paginator.paginate_queryset(queryset, self.request, view=self)
@@ -1,7 +1,12 @@
 from django.http import JsonResponse
 from django_tenants.utils import get_tenant_model
-from apps.api.models import APIConsumer
-from django.utils import timezone
+from apps.api.consumers import get_consumer, record_usage
+from newsbookbackend.tenant_registry import registry
+
+
+def load_tenant(schema_name):
+    return get_tenant_model().objects.get(schema_name=schema_name)
+
 
 class APIAuthMiddleware:
     def __init__(self, get_response):
@@ -20,28 +25,28 @@ class APIAuthMiddleware:
         # Obtiene schema de headers O parámetros
         schema_name = self._get_schema_from_request(request)
 
-        try:
-            consumer = APIConsumer.objects.get(token=api_token, is_active=True)
-            request.api_consumer = consumer
+        consumer = get_consumer(api_token)
+        if consumer is None:
+            return JsonResponse({'error': 'Invalid API token'}, status=401)
+        request.api_consumer = consumer
 
+        try:
             # Lógica de tenant
             if schema_name:
-                tenant = get_tenant_model().objects.get(schema_name=schema_name)
+                tenant = registry.get_by_schema(schema_name, load_tenant)
                 if not consumer.can_access_tenant(tenant):
                     return JsonResponse({'error': 'Token not authorized for this tenant'}, status=403)
+                if not consumer.can_access_path(tenant, request.path):
+                    return JsonResponse({'error': 'Token not authorized for this path'}, status=403)
                 request.tenant = tenant
             elif not consumer.has_full_access:
                 return JsonResponse({'error': 'Schema required for this token'}, status=400)
-
-            consumer.last_used_at = timezone.now()
-            consumer.usage_count += 1
-            consumer.save()
-
-        except APIConsumer.DoesNotExist:
-            return JsonResponse({'error': 'Invalid API token'}, status=401)
         except get_tenant_model().DoesNotExist:
             return JsonResponse({'error': 'Invalid tenant schema'}, status=400)
 
+        # El uso se acumula en Redis y se vuelca periódicamente (apps.api.tasks.flush_api_usage)
+        record_usage(consumer)
+
         return self.get_response(request)
 
     def _get_token_from_request(self, request):
@@ -32,6 +32,25 @@ app.conf.broker_url = BASE_REDIS_URL
 app.conf.beat_scheduler = 'django_celery_beat.schedulers.DatabaseScheduler'
 
 # Configuración de Tareas Periodicas
+app.conf.beat_schedule = {
+    'flush-api-usage': {
+        'task': 'apps.api.tasks.flush_api_usage',
+        'schedule': 60.0,
+    },
+    'drain-facial-events': {
+        'task': 'apps.api.tasks.drain_facial_events',
+        'schedule': 5.0,
+    },
+    'maintain-facial-event-partitions': {
+        'task': 'apps.setting.tasks.maintain_facial_event_partitions',
+        'schedule': 60.0 * 60 * 6,
+    },
+    'build-access-snapshots': {
+        'task': 'apps.main.tasks.build_access_snapshots',
+        'schedule': 300.0,
+    },
+}
+
 '''
 from celery.schedules import crontab
 app.conf.beat_schedule = {
@@ -10,6 +10,8 @@ from django_tenants.utils import remove_www, get_public_schema_name, get_tenant_
 
 from django.conf import settings
 
+from newsbookbackend.tenant_registry import registry
+
 threadlocal = threading.local()
 
 
@@ -29,26 +31,32 @@ class XHeaderTenantMiddleware(MiddlewareMixin):
         return remove_www(request.get_host().split(':')[0])
 
     def get_tenant_for_hostname(self, domain_model, hostname):
+        connection.set_schema_to_public()
         domain = domain_model.objects.select_related('tenant').get(domain=hostname)
         return domain.tenant
 
     def get_tenant(self, model, schema_name):
+        connection.set_schema_to_public()
         return model.objects.get(schema_name=schema_name)
 
     def process_request(self, request):
-        # Connection needs first to be at the public schema, as this is where
-        # the tenant metadata is stored.
-        connection.set_schema_to_public()
+        # Los tenants se resuelven desde el registro en memoria; solo en caso de
+        # fallo se consulta el schema público, donde vive la metadata de tenants.
         hostname = self.hostname_from_request(request)
         tenant_model = get_tenant_model()
+        domain_model = get_tenant_domain_model()
         try:
             schema_name = request.headers.get('X-Dts-Schema', None)
             if schema_name:
-                tenant = self.get_tenant(tenant_model, schema_name)
+                tenant = registry.get_by_schema(
+                    schema_name, lambda key: self.get_tenant(tenant_model, key)
+                )
             else:
-                domain_model = get_tenant_domain_model()
-                tenant = self.get_tenant_for_hostname(domain_model, hostname)
-        except tenant_model.DoesNotExist:
+                tenant = registry.get_by_hostname(
+                    hostname, lambda key: self.get_tenant_for_hostname(domain_model, key)
+                )
+        except (tenant_model.DoesNotExist, domain_model.DoesNotExist):
+            connection.set_schema_to_public()
             self.no_tenant_found(request, hostname)
             return
 
@@ -32,6 +32,10 @@ env = environ.Env(
     EMAIL_PORT=(int, 587),
     API_IBARTI=(str, 'http://localhost/api-ibarti2'),
     HOST_LINKS=(str, 'http://localhost:4200'),
+    REDIS_URL=(str, 'redis://localhost:6379/0'),
+    CACHE_REDIS_URL=(str, 'redis://localhost:6379/1'),
+    TENANT_CACHE_TTL=(int, 300),
+    FACIAL_AUDIT_LOG_DIR=(str, ''),
 )
 
 # reading .env file
@@ -236,6 +240,22 @@ REST_FRAMEWORK = {
     ],
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': env('CACHE_REDIS_URL'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        }
+    }
+}
+
+# Segundos que un tenant resuelto permanece en el registro en memoria de cada worker
+TENANT_CACHE_TTL = env('TENANT_CACHE_TTL')
+
+# Segmentos comprimidos por tenant con los payloads recibidos de reconocimiento facial (apps.api.audit)
+FACIAL_AUDIT_LOG_DIR = env('FACIAL_AUDIT_LOG_DIR') or os.path.join(BASE_DIR, 'logs', 'facial_recognition')
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
@@ -328,7 +348,8 @@ IMPORT_EXPORT_USE_TRANSACTIONS = True
 IMPORT_EXPORT_IMPORT_PERMISSION_CODE = 'change'
 
 # CELERY STUFF
-BROKER_URL = 'redis://localhost:6379/0'
+REDIS_URL = env('REDIS_URL')
+BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
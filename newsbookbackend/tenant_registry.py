@@ -0,0 +1,133 @@
+import copy
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'tenant-registry:invalidate'
+
+
+class TenantRegistry:
+    """
+    Cache en memoria (por proceso) de los tenants resueltos por el middleware.
+
+    Las entradas se indexan por schema_name y por hostname, expiran a los
+    TENANT_CACHE_TTL segundos y se invalidan en todos los workers a través de
+    Redis pub/sub cuando cambia un Client o un Domain.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'TENANT_CACHE_TTL', 300)
+        self.enabled = getattr(settings, 'TENANT_CACHE_ENABLED', True)
+        self._by_schema = {}
+        self._by_hostname = {}
+        self._lock = threading.Lock()
+        self._listener_pid = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_by_schema(self, schema_name, loader):
+        return self._get(self._by_schema, schema_name, loader)
+
+    def get_by_hostname(self, hostname, loader):
+        return self._get(self._by_hostname, hostname, loader)
+
+    def _get(self, entries, key, loader):
+        if not self.enabled:
+            return loader(key)
+
+        self._ensure_listener()
+        entry = entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            # Copia superficial para que cada petición pueda modificar el tenant
+            # (ej: domain_url) sin afectar la instancia compartida
+            return copy.copy(entry[0])
+
+        self.misses += 1
+        tenant = loader(key)
+        with self._lock:
+            entries[key] = (tenant, time.monotonic() + self.ttl)
+        return copy.copy(tenant)
+
+    def invalidate(self, schema_name=None):
+        """ Elimina las entradas del tenant indicado, o todas si no se indica ninguno """
+        with self._lock:
+            if schema_name is None:
+                self._by_schema.clear()
+                self._by_hostname.clear()
+                return
+            self._by_schema.pop(schema_name, None)
+            for hostname, (tenant, _) in list(self._by_hostname.items()):
+                if tenant.schema_name == schema_name:
+                    self._by_hostname.pop(hostname, None)
+
+    def publish_invalidation(self, schema_name=None):
+        """ Invalida localmente y notifica al resto de workers """
+        self.invalidate(schema_name)
+        try:
+            get_redis_connection('default').publish(
+                INVALIDATION_CHANNEL, json.dumps({'schema_name': schema_name})
+            )
+        except Exception as e:
+            logger.warning("No se pudo publicar la invalidación de tenants: %s", e)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'schemas': len(self._by_schema),
+            'hostnames': len(self._by_hostname),
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_listener(self):
+        # El hilo se arranca de forma perezosa y por PID para que sobreviva al
+        # fork de los workers de gunicorn (preload_app)
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            # Lo que se haya cacheado en el proceso padre pudo quedar obsoleto
+            self._by_schema.clear()
+            self._by_hostname.clear()
+        thread = threading.Thread(target=self._listen, name='tenant-registry-listener', daemon=True)
+        thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = get_redis_connection('default').pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Mientras no hay suscripción activa se pudieron perder mensajes
+                self.invalidate()
+                for message in pubsub.listen():
+                    try:
+                        payload = json.loads(message['data'])
+                    except (TypeError, ValueError):
+                        continue
+                    self.invalidate(payload.get('schema_name'))
+            except Exception as e:
+                logger.warning("Listener de invalidación de tenants desconectado: %s", e)
+                # Sin canal de invalidación el TTL es la única garantía; se
+                # vacía la cache para no servir datos obsoletos por más tiempo
+                self.invalidate()
+                time.sleep(5)
+
+
+registry = TenantRegistry()
+